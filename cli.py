@@ -0,0 +1,139 @@
+import argparse
+import os
+import sys
+import time
+
+from function import engine
+from function import segmenter
+
+
+# Command-line entry point for display-less render boxes (no Tk is imported on this path)
+#   python cli.py render script.txt --preset presets/preset_1.json --out renders/ --workers 8
+
+
+def cmd_render(args):
+    with open(args.script, "r", encoding="utf-8") as f:
+        paragraphs = segmenter.split_script(f.read(), args.split)
+    if not paragraphs:
+        print("❌ Script is empty, nothing to render.")
+        return 1
+
+    if args.preset:
+        voice, sliders, switches = engine.load_preset(args.preset)
+    else:
+        voice, sliders, switches = engine.DEFAULT_VOICE, dict(engine.DEFAULT_SLIDERS), dict(engine.DEFAULT_SWITCHES)
+    if args.voice:
+        voice = args.voice
+
+    total = len(paragraphs)
+    print(f"🚀 Rendering {total} segments with {voice} ({args.workers} workers) -> {args.out}")
+
+    def on_done(index, entry):
+        mark = "✅" if entry["status"] == "ok" else "❌"
+        detail = entry["output"] if entry["status"] == "ok" else entry.get("error", "")
+        print(f"{mark} [{index}/{total}] {detail} ({entry['elapsed_sec']}s)")
+
+    manifest = engine.render_script(paragraphs, voice, sliders, switches, args.out,
+                                    workers=args.workers, on_done=on_done)
+
+    print(f"✨ Done: {manifest['ok']} ok, {manifest['failed']} failed in {manifest['elapsed_sec']}s "
+          f"(manifest: {os.path.join(args.out, 'manifest.json')})")
+    return 0 if manifest["failed"] == 0 else 2
+
+
+def cmd_bench_dsp(args):
+    import numpy as np
+    from function import dsp
+
+    # Synthetic speech-like signal (noise bursts) so every effect has something to chew on
+    sr = args.sr
+    rng = np.random.default_rng(0)
+    n = int(args.seconds * sr)
+    audio = (rng.standard_normal(n) * 0.2 * (np.sin(np.arange(n) / sr * 2 * np.pi * 3) > 0)).astype(np.float32)
+
+    params = dsp.DSPParams(rev=30, echo=20, chorus=20, bass=6, treble=4, vol=120,
+                           limiter=True, normalize=True, gate=True)
+    processor = dsp.DSPProcessor(params, sr)
+    processor.process(audio)  # warm-up
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        processor.process(audio)
+    elapsed = (time.perf_counter() - t0) / args.repeat
+    print(f"✅ DSP engine: {args.seconds:.0f}s of audio in {elapsed * 1000:.1f} ms "
+          f"(real-time factor {elapsed / args.seconds:.4f})")
+    return 0
+
+
+def cmd_bench_clone(args):
+    from function import convert_backends, voice_model
+
+    model = voice_model.get_converter()
+    names = list(convert_backends.BACKENDS) if args.backend == "all" else [args.backend]
+    reference = convert_backends.EagerBackend(model)
+
+    for name in names:
+        try:
+            t0 = time.perf_counter()
+            backend = convert_backends.BACKENDS[name](model)
+            build_sec = time.perf_counter() - t0
+        except Exception as e:
+            print(f"❌ {name}: unavailable ({e})")
+            continue
+
+        try:
+            parity = {"ok": True, "snr_db": "ref", "max_abs": 0.0} if name == "eager" else \
+                convert_backends.parity_check(model, backend, reference)
+            if "error" in parity:
+                raise RuntimeError(parity["error"])
+            bench = convert_backends.benchmark(model, backend, seconds=args.seconds, batch=args.batch,
+                                               repeat=args.repeat)
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            continue
+        mark = "✅" if parity["ok"] else "⚠️"
+        print(f"{mark} {name:<12} rtf {bench['rtf']:.4f}  ({bench['elapsed_sec'] * 1000:.0f} ms / "
+              f"{args.batch}x{args.seconds:.0f}s)  parity SNR {parity['snr_db']} dB, "
+              f"max diff {parity['max_abs']:.2e}  build {build_sec:.1f}s")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Edge-TTS AI Generator Studio - headless tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_render = sub.add_parser("render", help="Render a script file (one segment per line) to WAV files")
+    p_render.add_argument("script", help="UTF-8 text file, one paragraph per line")
+    p_render.add_argument("--preset", help="Preset JSON saved from the app (presets/*.json)")
+    p_render.add_argument("--voice", help="Override the preset voice (e.g. en-US-AriaNeural)")
+    p_render.add_argument("--out", default="renders", help="Output folder (default: renders)")
+    p_render.add_argument("--workers", type=int, default=4, help="Segments rendered in parallel (default: 4)")
+    p_render.add_argument("--split", choices=segmenter.SPLIT_MODES, default=None,
+                          help="lines = one segment per line, balanced = sentence-aware even-sized segments "
+                               "(default: VG_SPLIT_MODE or lines)")
+    p_render.set_defaults(func=cmd_render)
+
+    p_bench = sub.add_parser("bench-dsp", help="Benchmark the shared DSP engine on synthetic audio")
+    p_bench.add_argument("--seconds", type=float, default=60.0, help="Length of the test signal (default: 60)")
+    p_bench.add_argument("--sr", type=int, default=24000, help="Sample rate (default: 24000)")
+    p_bench.add_argument("--repeat", type=int, default=5, help="Timed runs to average (default: 5)")
+    p_bench.set_defaults(func=cmd_bench_dsp)
+
+    p_clone = sub.add_parser("bench-clone", help="Parity check + real-time factor of the converter CPU backends")
+    p_clone.add_argument("--backend", default="all", choices=["all", "eager", "torchscript", "onnx"],
+                         help="Backend to test (default: all)")
+    p_clone.add_argument("--seconds", type=float, default=10.0, help="Audio length per item (default: 10)")
+    p_clone.add_argument("--batch", type=int, default=1, help="Items per forward pass (default: 1)")
+    p_clone.add_argument("--repeat", type=int, default=3, help="Timed runs to average (default: 3)")
+    p_clone.set_defaults(func=cmd_bench_clone)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
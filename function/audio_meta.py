@@ -0,0 +1,66 @@
+import os
+import threading
+
+import soundfile as sf
+
+
+# --- AUDIO METADATA INDEX ---
+# Duration / sample rate / channels read from file headers only (no decoding), kept in memory
+# keyed by (path, mtime, size) so a regenerated file is probed again and an unchanged one never is.
+
+_lock = threading.Lock()
+_index = {}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_header(path):
+    """soundfile for WAV/FLAC/OGG (and MP3 on libsndfile >= 1.1), pedalboard for anything else"""
+    try:
+        info = sf.info(path)
+        return {"frames": info.frames, "samplerate": info.samplerate, "channels": info.channels}
+    except Exception:
+        from pedalboard.io import AudioFile
+        with AudioFile(path) as f:
+            return {"frames": f.frames, "samplerate": f.samplerate, "channels": f.num_channels}
+
+
+def probe(path):
+    """
+    Metadata dict for an audio file: frames, samplerate, channels, duration (seconds).
+    Served from the index while the file's mtime/size are unchanged.
+    """
+    path = os.path.abspath(path)
+    stamp = _stamp(path)
+    with _lock:
+        entry = _index.get(path)
+        if entry and entry["stamp"] == stamp:
+            return entry["meta"]
+
+    meta = _read_header(path)
+    meta["duration"] = meta["frames"] / meta["samplerate"] if meta["samplerate"] else 0.0
+    with _lock:
+        _index[path] = {"stamp": stamp, "meta": meta}
+    return meta
+
+
+def duration(path):
+    return probe(path)["duration"]
+
+
+def record(path, frames, samplerate, channels):
+    """Register a file we just wrote ourselves, so the first play doesn't even read the header"""
+    path = os.path.abspath(path)
+    meta = {"frames": frames, "samplerate": samplerate, "channels": channels,
+            "duration": frames / samplerate if samplerate else 0.0}
+    with _lock:
+        _index[path] = {"stamp": _stamp(path), "meta": meta}
+    return meta
+
+
+def forget(path):
+    with _lock:
+        _index.pop(os.path.abspath(path), None)
@@ -1,31 +1,26 @@
 import shutil
 import sys
-import edge_tts
 import threading
-import pygame
-import asyncio
 import json
 import os
-import librosa
 import soundfile as sf
-from datetime import datetime
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-import numpy as np
-from pydub import AudioSegment
-from pedalboard import Pedalboard, Reverb, Delay, Chorus, LowShelfFilter, HighShelfFilter, Compressor, NoiseGate, Limiter
-from pedalboard.io import AudioFile
-import time
-import torch
-from openvoice_cli.api import ToneColorConverter
-from openvoice_cli.api import ToneColorConverter
-try:
-    from openvoice_cli import se_extractor
-    print("✅ ToneColorConverter and se_extractor loaded")
-except ImportError:
-    print("⚠️ Warning: se_extractor not found, you will not be able to extract sample voices.")
-import unicodedata
-import re
+from concurrent.futures import ThreadPoolExecutor
+import function.tts_cache as tts_cache
+import function.tts_loop as tts_loop
+import function.stream_preview as stream_preview
+import function.engine as engine
+import function.dsp as dsp
+import function.audio_meta as audio_meta
+import function.voice_model as voice_model
+import function.se_cache as se_cache
+import function.clone_engine as clone_engine
+import function.clone_workers as clone_workers
+import function.pipeline as pipeline
+import function.segments as segments
+import function.segmenter as segmenter
+from function.engine import slugify_text
 
 
 
@@ -39,20 +34,13 @@ site_pkg = os.path.join(os.getcwd(), "venv", "Lib", "site-packages")
 if site_pkg not in sys.path:
     sys.path.insert(0, site_pkg)
 
-# 3. Configure AI execution device (Priority GPU if available, else CPU)
-device = "cuda" if torch.cuda.is_available() else "cpu"
+# 3. Number of Edge-TTS requests "Generate All" keeps in flight at the same time
+GEN_MAX_CONCURRENCY = max(1, int(os.environ.get("VG_GEN_CONCURRENCY", "4")))
 
-
-def get_all_edge_voices():
-    """Get list of all current Edge TTS voices"""
-    async def fetch():
-        voices = await edge_tts.list_voices()
-        # Get ShortName and sort alphabetically for easy search
-        return sorted([v["ShortName"] for v in voices])
-    
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    return loop.run_until_complete(fetch())
+# 4. Opt-in (VG_PREVIEW_STREAMING=1, needs ffmpeg): preview plays while Edge-TTS is still streaming.
+#    Streamed audio goes through pygame, not the master player, so Stop/Seek/Volume don't apply to it
+#    and live playback is not normalized (the saved preview file is).
+PREVIEW_STREAMING = os.environ.get("VG_PREVIEW_STREAMING", "0") == "1"
 
 
 def save_preset(self):
@@ -194,16 +182,23 @@ def load_preset_file(self, filename):
 
 
 def preview_voice(self):
+    # 1. Collect data here on the Tk thread, the worker below never touches widgets
+    selected_voice = self.edge_voice_dropdown.get()
+    raw_text = self.preview_textbox.get("1.0", "end-1c").strip()
+    c = {k: v["widget"].get() for k, v in self.sliders_cfg.items()}
+    switches = {
+        "gate": self.cfg_gate_sw.get(),
+        "normalize": self.cfg_normalize_sw.get(),
+        "limiter": self.cfg_limiter_sw.get()
+    }
+
     def run_preview():
         try:
             # 0. Release file
             if hasattr(self, 'player'):
                 self.player.stop()
                 self.player.set_media(None) 
-
-            # 1. Collect data
-            selected_voice = self.edge_voice_dropdown.get()
-            raw_text = self.preview_textbox.get("1.0", "end-1c").strip()
+            stream_preview.stop_active()
             
             sample_texts = {
                 "vi": "Chào bạn, đây là âm thanh mẫu tiếng Việt với cấu hình hiện tại.",
@@ -221,95 +216,45 @@ def preview_voice(self):
             default_en = sample_texts["en"]
             text_to_read = raw_text if raw_text else sample_texts.get(lang_code, default_en)
 
-            # 2. Get indices
-            c_speed     = self.sliders_cfg["speed"]["widget"].get()
-            c_pitch     = self.sliders_cfg["pitch"]["widget"].get()
-            c_volume    = self.sliders_cfg["volume"]["widget"].get()
-            c_reverb    = self.sliders_cfg["reverb"]["widget"].get()
-            c_bass      = self.sliders_cfg["bass"]["widget"].get()
-            c_treble    = self.sliders_cfg["treble"]["widget"].get()
-            c_echo      = self.sliders_cfg["echo"]["widget"].get()
-            c_chorus    = self.sliders_cfg["chorus"]["widget"].get()
-            c_threshold = self.sliders_cfg["thresh"]["widget"].get() 
-            c_ratio     = self.sliders_cfg["ratio"]["widget"].get()
-
-            # 3. Edge-TTS formatting
-            rate_str  = f"{int((c_speed - 1.0) * 100):+d}%"
-            pitch_str = f"{int(c_pitch):+d}Hz"
-            vol_str   = f"{int(c_volume - 100):+d}%"
+            # 2. Get indices (same parameter object as Gen and the Reference Editor)
+            params = dsp.DSPParams.from_dicts(c, switches)
+
+            # 3. Edge-TTS formatting (volume is applied by the DSP engine, like Gen)
+            rate_str, pitch_str = engine.tts_strings(c)
+            vol_str = "+0%"
 
             # 4. File paths
             base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             temp_dir = os.path.join(base_dir, "temp")
             if not os.path.exists(temp_dir): os.makedirs(temp_dir)
             
-            raw_path = os.path.join(temp_dir, "edge_raw.mp3")
             processed_path = os.path.join(temp_dir, "preview_processed.wav")
 
-            # 5. Create raw audio
-            import asyncio, edge_tts
-            async def make_audio():
-                communicate = edge_tts.Communicate(text_to_read, selected_voice, rate=rate_str, pitch=pitch_str, volume=vol_str)
-                await communicate.save(raw_path)
-
-            new_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(new_loop)
-            new_loop.run_until_complete(make_audio())
-            new_loop.close()
-
-            # 6. OPTIMIZED POST-PROCESSING
-            import librosa, numpy as np, soundfile as sf
-            y, sr = librosa.load(raw_path, sr=None)
-
-            # --- A. NOISE GATE ---
-            if self.cfg_gate_sw.get():
-                y, _ = librosa.effects.trim(y, top_db=abs(c_threshold))
-
-            # --- B. COMPRESSOR ---
-            if c_ratio > 1.0:
-                thresh_amp = librosa.db_to_amplitude(c_threshold)
-                mask = np.abs(y) > thresh_amp
-                y[mask] = np.sign(y[mask]) * (thresh_amp + (np.abs(y[mask]) - thresh_amp) / c_ratio)
-
-            # --- C. EQ: BASS & TREBLE ---
-            if c_bass > 0:
-                y = librosa.effects.preemphasis(y, coef=0.2 + (c_bass/100))
-            if c_treble > 0:
-                y = y + (np.diff(y, prepend=y[0]) * (c_treble / 50))
-
-            # --- D. ECHO ---
-            if c_echo > 0:
-                delay = int(0.15 * sr)
-                if len(y) > delay:
-                    echo_wet = np.zeros_like(y)
-                    echo_wet[delay:] = y[:-delay] * (c_echo / 300)
-                    y = y + echo_wet
-
-            # --- E. REVERB/CHORUS ---
-            if c_reverb > 0 or c_chorus > 0:
-                shift = int(sr * 0.02)
-                if len(y) > shift:
-                    rev_wet = np.zeros_like(y)
-                    rev_wet[shift:] = y[:-shift] * (max(c_reverb, c_chorus) / 400)
-                    y = (y * 0.9) + rev_wet
-
-            # --- F. NORMALIZE & VOLUME BOOST ---
-            if self.cfg_normalize_sw.get():
-                y = librosa.util.normalize(y)
-
-            gain_factor = c_volume / 100.0
-            if gain_factor != 1.0:
-                y = y * gain_factor
-
-            # --- G. LIMITER ---
-            if self.cfg_limiter_sw.get() or gain_factor > 1.0:
-                y = np.clip(y, -0.99, 0.99)
+            # 5a. STREAMING MODE: first block plays while the rest is still being synthesized
+            if PREVIEW_STREAMING and stream_preview.find_ffmpeg():
+                self.ui_bus.call(lambda: self.lbl_now_playing.configure(text=f"Streaming preview: {selected_voice}", text_color="#2ecc71"))
+
+                y, sr = stream_preview.stream_preview(text_to_read, selected_voice, rate_str, pitch_str, vol_str,
+                                                      params)
+                # Keep full processed result on disk, same file as the buffered mode
+                # (a preview stopped by a newer one leaves the file to that one)
+                if y is not None:
+                    sf.write(processed_path, y, sr)
+                return
+
+            # 5. Create raw audio in memory (served from the TTS cache when nothing changed)
+            # Runs on the shared Edge-TTS loop thread, this thread only waits for the result
+            mp3_bytes = tts_loop.run(tts_cache.fetch_tts_bytes(text_to_read, selected_voice, rate_str, pitch_str, vol_str))
+            audio, sr = engine.decode_audio_bytes(mp3_bytes)
+
+            # 6. UNIFIED DSP ENGINE
+            y = dsp.process(audio, sr, params)
 
             # 7. Write file and push to Player
-            sf.write(processed_path, y, sr)
-            duration = librosa.get_duration(y=y, sr=sr)
+            sf.write(processed_path, y.T, sr)
+            duration = y.shape[1] / sr
             
-            self.after(0, lambda: self.load_to_master(processed_path, f"Preview: {selected_voice}", duration))
+            self.ui_bus.call(self.load_to_master, processed_path, f"Preview: {selected_voice}", duration)
 
         except Exception as e:
             print(f"Effect processing error: {e}")
@@ -323,189 +268,74 @@ def process_text_to_queue(self):
         messagebox.showwarning("Notice", "Please enter text before splitting segments!")
         return
 
-    paragraphs = [p.strip() for p in raw_content.split("\n") if p.strip()]
-
-    for widget in self.queue_frame.winfo_children():
-        widget.destroy()
+    # "Lines" keeps one segment per line, "Balanced" evens out segment sizes across sentences
+    mode = self.split_mode_dd.get().lower() if hasattr(self, "split_mode_dd") else None
+    paragraphs = segmenter.split_script(raw_content, mode)
 
-    # --- UPDATE HERE: Get preset from actual folder ---
-    available_presets = get_preset_list()
+    # Segments are data in the store; the queue view observes it and only builds visible rows.
+    # Re-split diffs by content: unchanged paragraphs keep their settings and audio.
+    kept, added, removed = self.segments.resplit(paragraphs, main_cfg_params(self))
 
-    self.queue_items_data = [] 
-    
-    for index, text in enumerate(paragraphs):
-        # Pass the actual preset list in
-        item_widget = self.add_queue_item(text, available_presets)
-        
-        self.queue_items_data.append({
-            "id": index,
-            "text": text,
-            "widget": item_widget
-        })
+    # Audio of removed paragraphs is orphaned; new ids must not pick up files from an older session
+    for seg in removed + added:
+        try:
+            for path in seg.discard_audio():
+                audio_meta.forget(path)
+        except OSError as e:
+            print(f"⚠️ Could not remove {seg.audio_path}: {e}")
 
-    try:
-        self.queue_frame._parent_canvas.yview_moveto(0)
-    except:
-        pass
+    print(f"✂️ Split into {len(self.segments)} segments ({len(kept)} kept, {len(added)} new, {len(removed)} removed)")
 
 
 # Định nghĩa các hàm rỗng để test giao diện
-def generate_one(self, text, widgets):
+def generate_one(self, seg):
     try:
-        # --- STEP 1: FIX INDEX (WHICH SEGMENT) ---
-        # Get parent container of these widgets
-        # widgets["sliders"]["speed"]["slider"] -> đi ngược lên tới item_container
-        any_widget = list(widgets["sliders"].values())[0]["slider"]
-        item_container = any_widget.master.master.master # Depending on nesting structure, we get the main container
-        
-        # Find index of the paragraph in queue_frame (starts from 1)
-        all_items = self.queue_frame.winfo_children()
-        try:
-            item_index = all_items.index(item_container) + 1
-        except:
-            item_index = "unknown"
-
-        # --- STEP 2: EXTRACT SPECIFIC PARAMETERS ---
-        p = {k: v["slider"].get() for k, v in widgets["sliders"].items()}
-        sw = {k: v.get() for k, v in widgets["switches"].items()}
-        selected_voice = widgets["voice_dd"].get()
-
-        # --- STEP 3: FILE PATHS (index + 1) ---
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        temp_dir = os.path.join(base_dir, "temp")
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-
-        # Raw file and final file named by sequence number
-        raw_path = os.path.join(temp_dir, f"raw_{item_index}.mp3")
-        final_path = os.path.join(temp_dir, f"{item_index}.wav")  # Lưu WAV để clone_one xử lý
+        # --- STEP 1: SEGMENT SETTINGS (copied from the segment, not read from widgets) ---
+        selected_voice, p, sw = seg.params()
 
-        # --- STEP 4: SPEECH GENERATION (EDGE-TTS) ---
-        async def run_tts():
-            speed_str = f"{int((p['speed'] - 1.0) * 100):+}%"
-            pitch_str = f"{int(p['pitch']):+}Hz"
-            communicate = edge_tts.Communicate(text, selected_voice, rate=speed_str, pitch=pitch_str)
-            await communicate.save(raw_path)
+        # --- STEP 2: FILE PATH (artifact path of the segment) ---
+        # Raw TTS audio stays in memory, only the final WAV is written
+        final_path = seg.audio_path  # Lưu WAV để clone_one xử lý
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
 
-        asyncio.run(run_tts())
+        # --- STEP 3: TTS + EFFECTS + VOLUME (shared with the headless engine) ---
+        engine.render_segment(seg.text, selected_voice, p, sw, final_path)
 
-        # --- STEP 5: EFFECTS PROCESSING (PEDALBOARD) ---
-        with AudioFile(raw_path) as f:
-            audio_data = f.read(f.frames)
-            sr = f.samplerate # Fixed samplerate error
-
-        board = Pedalboard()
-
-        if sw.get("gate"):
-            board.append(NoiseGate(threshold_db=-40))
-
-        # EQ: Bass & Treble
-        board.append(LowShelfFilter(cutoff_frequency_hz=250, gain_db=p['bass']))
-        board.append(HighShelfFilter(cutoff_frequency_hz=4000, gain_db=p['treble']))
-
-        if p['chorus'] > 0:
-            board.append(Chorus(mix=p['chorus']/100))
-        
-        if p['echo'] > 0:
-            board.append(Delay(delay_seconds=0.25, feedback=0.3, mix=p['echo']/100))
-
-        # Use correct key 'rev' from your create_local_slider
-        if p.get('rev', 0) > 0:
-            board.append(Reverb(room_size=p['rev']/100, wet_level=p['rev']/200))
-
-        # Compressor (Thresh & Ratio)
-        board.append(Compressor(threshold_db=p['thresh'], ratio=p['ratio']))
-
-        if sw.get("limiter"):
-            board.append(Limiter(threshold_db=-1.0))
-
-        processed_audio = board(audio_data, sr)
-
-        with AudioFile(final_path, 'w', sr, processed_audio.shape[0]) as f:
-            f.write(processed_audio)
-
-        # --- STEP 6: VOLUME & NORMALIZE (PYDUB) ---
-        audio = AudioSegment.from_file(final_path)
-        
-        # p['vol'] taken from "Vol" slider (0-250)
-        vol_db = (p['vol'] - 100) / 5
-        audio = audio + vol_db
-
-        if sw.get("normalize"):
-            audio = audio.normalize()
-
-        audio.export(final_path, format="wav")
-
-        # Delete raw file
-        if os.path.exists(raw_path):
-            os.remove(raw_path)
-
-        # --- CHANGE GEN BUTTON COLOR TO MARK DONE ---
-        if "buttons" in widgets and "gen" in widgets["buttons"]:
-            # Change to green (Success) or color you like
-            widgets["buttons"]["gen"].configure(fg_color="#28a745", hover_color="#218838")
-            # Optional: Change text to "Done"
-            # widgets["buttons"]["gen"].configure(text="Done")
+        # --- MARK DONE (Gen button turns green) ---
+        self.segments.set_status(seg.id, "gen", segments.STATUS_OK)
 
         print(f"✅ Created segment: {final_path}")
         return final_path
 
     except Exception as e:
-        if "buttons" in widgets and "gen" in widgets["buttons"]:
-            widgets["buttons"]["gen"].configure(fg_color="#dc3545", hover_color="#c82333")
+        self.segments.set_status(seg.id, "gen", segments.STATUS_ERROR)
         print(f"❌ Error: {e}")
         return None
 
 
 
-def play_one(self, paragraph_text):
+def play_one(self, seg):
     """
     Function to play audio of a specific paragraph.
     Uses load_to_master to push to application's main player.
     """
-    import os
-    import librosa
-    from tkinter import messagebox
+    found_idx = self.segments.position(seg.id)
 
-    # 1. Determine Index of paragraph in queue list
-    items = self.queue_frame.winfo_children()
-    found_idx = -1
-    
-    for i, item in enumerate(items):
-        # Check if paragraph_text was assigned to item_container in add_queue_item
-        if hasattr(item, "paragraph_text") and item.paragraph_text == paragraph_text:
-            found_idx = i + 1
-            break
-            
-    if found_idx == -1:
-        return
-
-    # 2. Determine audio file path
+    # 1. Determine audio file path
     # Priority for .wav (result after Clone) then .mp3 (original Gen result)
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    temp_dir = os.path.join(base_dir, "temp")
-    
-    file_path_wav = os.path.join(temp_dir, f"{found_idx}.wav")
-    file_path_mp3 = os.path.join(temp_dir, f"{found_idx}.mp3")
-    
-    final_path = None
-    if os.path.exists(file_path_wav):
-        final_path = file_path_wav
-    elif os.path.exists(file_path_mp3):
-        final_path = file_path_mp3
+    final_path = seg.existing_audio()
 
     if not final_path:
         messagebox.showwarning("Notice", f"No audio file for segment {found_idx}. Please click 'Gen' first.")
         return
 
-    # 3. Calculate duration and load into Master Player
+    # 2. Calculate duration and load into Master Player
     try:
-        # Load file info to get duration (same as in preview_voice and play_ref_audio)
-        y, sr = librosa.load(final_path, sr=None)
-        duration = librosa.get_duration(y=y, sr=sr)
+        # Duration from the file header (metadata index), no decoding
+        duration = audio_meta.duration(final_path)
         
         # Display name on Player
-        display_name = f"Segment {found_idx}: {paragraph_text[:20]}..."
+        display_name = f"Segment {found_idx}: {seg.text[:20]}..."
         
         # Call function to load into master player (imported in ref.py or main app)
         self.load_to_master(final_path, display_name, duration)
@@ -518,65 +348,24 @@ def play_one(self, paragraph_text):
 
 
 
-def slugify_text(text, length=30):
-    """
-    Chuyển văn bản thành không dấu, loại bỏ ký tự đặc biệt để làm tên file.
-    """
-    if not text:
-        return ""
-    
-    # 1. Chuyển Unicode dựng sẵn về dạng tổ hợp (NFD) để tách dấu
-    # Ví dụ: "ế" sẽ thành "ê" + "ˊ"
-    text = unicodedata.normalize('NFD', text)
-    
-    # 2. Loại bỏ các ký tự dấu (Non-spacing Mark)
-    text = "".join([c for c in text if unicodedata.category(c) != 'Mn'])
-    
-    # 3. Chuyển chữ "đ" sang "d" (vì bước trên không xử lý được chữ đ/Đ)
-    text = text.replace('đ', 'd').replace('Đ', 'D')
-    
-    # 4. Loại bỏ ký tự đặc biệt, chỉ giữ lại chữ cái, số và khoảng trắng
-    clean_text = re.sub(r'[\\/*?:"<>|]', "", text)
-    
-    # 5. Cắt 30 ký tự đầu và xóa khoảng trắng thừa ở 2 đầu
-    return clean_text[:length].strip()
-
-
-
-
-def save_one(self, paragraph_text):
+def save_one(self, seg):
     """Lưu file audio của đoạn văn bản cụ thể với tên không dấu (max 30 ký tự)"""
-    # 1. Xác định Index (giữ nguyên logic cũ)
-    items = self.queue_frame.winfo_children()
-    found_idx = -1
-    for i, item in enumerate(items):
-        if hasattr(item, "paragraph_text") and item.paragraph_text == paragraph_text:
-            found_idx = i + 1
-            break
-            
-    if found_idx == -1:
-        messagebox.showerror("Error", "Could not determine segment index.")
-        return
-
-    # 2. Xác định đường dẫn nguồn
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    temp_dir = os.path.join(base_dir, "temp")
-    src_wav = os.path.join(temp_dir, f"{found_idx}.wav")
-    src_mp3 = os.path.join(temp_dir, f"{found_idx}.mp3")
-    src_path = src_wav if os.path.exists(src_wav) else src_mp3 if os.path.exists(src_mp3) else None
+    # 1. Xác định đường dẫn nguồn
+    found_idx = self.segments.position(seg.id)
+    src_path = seg.existing_audio()
 
     if not src_path:
         messagebox.showwarning("Warning", f"Segment {found_idx} audio not created yet.")
         return
 
-    # 3. Tạo tên file sạch (không dấu, max 30 ký tự)
-    clean_name = slugify_text(paragraph_text, 30)
+    # 2. Tạo tên file sạch (không dấu, max 30 ký tự)
+    clean_name = slugify_text(seg.text, 30)
     if not clean_name:
         clean_name = f"segment_{found_idx}"
         
     ext = os.path.splitext(src_path)[1]
 
-    # 4. Mở cửa sổ lưu file
+    # 3. Mở cửa sổ lưu file
     save_path = filedialog.asksaveasfilename(
         title="Save paragraph audio",
         initialfile=f"{clean_name}{ext}",
@@ -584,7 +373,7 @@ def save_one(self, paragraph_text):
         filetypes=[("Audio Files", f"*{ext}"), ("All Files", "*.*")]
     )
 
-    # 5. Thực hiện copy
+    # 4. Thực hiện copy
     if save_path:
         try:
             shutil.copy2(src_path, save_path)
@@ -593,15 +382,9 @@ def save_one(self, paragraph_text):
             messagebox.showerror("Save Error", f"Could not save file: {str(e)}")
 
 
-def clone_one(self, paragraph_text, widgets, is_all=False):
-    # (Obtaining idx, source_path and ref_path remains the same...)
-    any_slider = list(widgets["sliders"].values())[0]["slider"]
-    item_container = any_slider.master.master.master
-    all_items = self.queue_frame.winfo_children()
-    try: idx = all_items.index(item_container) + 1
-    except: return
-
-    source_path = os.path.abspath(f"temp/{idx}.wav")
+def clone_one(self, seg):
+    idx = seg.id
+    source_path = seg.audio_path
     if not os.path.exists(source_path):
         messagebox.showwarning("Error", "Please click Gen first!")
         return
@@ -609,77 +392,40 @@ def clone_one(self, paragraph_text, widgets, is_all=False):
     ref_path = ctk.filedialog.askopenfilename(title="Select voice sample", filetypes=[("Audio", "*.wav *.mp3 *.m4a")])
     if not ref_path: return
 
-    output_path = os.path.abspath(f"temp/cloned_{idx}.wav")
-    ckpt_dir = os.path.abspath("checkpoints_v2/converter")
-
     def process_cloning():
         try:
             print(f"🧬 [Segment {idx}] Preparing data...")
             
-            # --- SOLUTION FOR "AUDIO TOO SHORT" ERROR ---
-            # We will create a longer temp file to extract SE
-            temp_se_path = os.path.abspath(f"temp/se_source_{idx}.wav")
-            audio_src = AudioSegment.from_file(source_path)
-            
-            # If audio is under 15 seconds, we clone it multiple times for certainty
-            # OpenVoice V2 is sometimes very strict with actual speech length
-            loop_count = 5 
-            extended_audio = audio_src * loop_count
-            extended_audio.export(temp_se_path, format="wav")
-            
-            # Khởi tạo model
-            print("📦 Initializing OpenVoice model...")
-            model = ToneColorConverter(os.path.join(ckpt_dir, 'config.json'), device=device)
-            model.load_ckpt(os.path.join(ckpt_dir, 'checkpoint.pth'))
-
-            processed_dir = 'temp/processed'
-            os.makedirs(processed_dir, exist_ok=True)
-
-            # Phân tích SE (Sử dụng file đã kéo dài temp_se_path cho Source)
-            print("🧬 Extracting target voice pattern...")
-            target_se, _ = se_extractor.get_se(ref_path, vc_model=model, target_dir=processed_dir, vad=True)
-            
-            print("🧬 Extracting source voice pattern (extended)...")
-            source_se, _ = se_extractor.get_se(temp_se_path, vc_model=model, target_dir=processed_dir, vad=True)
-
-            # IMPORTANT CONVERT STEP:
-            # - Use source_se (from long file) to get standard voice pattern
-            # - Use source_path (original file) as input so results don't repeat sound
-            # - convert() method automatically writes WAV file if output_path is provided
-            print("🚀 Converting tone...")
-            
-            # source_path is already WAV from generate_one, use directly
-            wav_source = source_path
+            # Shared resident model (loaded once per session, not per click)
+            with voice_model.use() as model:
+                processed_dir = 'temp/processed'
+                os.makedirs(processed_dir, exist_ok=True)
+
+                # Phân tích SE (target: SE cache, source: in-memory extraction)
+                print("🧬 Extracting target voice pattern...")
+                target_se = se_cache.get_se(ref_path, model, target_dir=processed_dir, vad=True)
             
-            # Output will be WAV (ToneColorConverter only returns WAV)
-            wav_output = os.path.abspath(f"temp/cloned_{idx}.wav")
-            
-            # Call convert with correct parameters - automatically writes WAV file
-            model.convert(
-                audio_src_path=wav_source, 
-                src_se=source_se,
-                tgt_se=target_se,
-                output_path=wav_output,
-                tau=0.3
-            )
-            # Clean up temp files (don't delete wav_source as it's source_path)
-            # Complete: OpenVoice has created output WAV file
-            if os.path.exists(wav_output):
-                time.sleep(0.5)
-                # Keep WAV output, don't convert to MP3
-                # Delete original WAV file and replace with cloned_output (both are WAV)
-                if os.path.exists(source_path): os.remove(source_path)
-                
-                # Rename cloned WAV file to original filename
-                os.rename(wav_output, source_path)
-
-            self.after(0, lambda: widgets["buttons"]["clone"].configure(fg_color="#6f42c1", text="Cloned"))
+                # Short segments are tiled in memory, no looped temp file
+                print("🧬 Extracting source voice pattern...")
+                source_se = clone_engine.source_se_from_file(model, source_path)
+
+                # IMPORTANT CONVERT STEP:
+                # - Use source_se (from in-memory extraction) to get standard voice pattern
+                # - Same conversion path as Clone All (selected CPU backend, atomic write over temp/{idx}.wav)
+                print("🚀 Converting tone...")
+                errors = []
+                clone_engine.convert_files(model, [(idx, source_path, source_path, source_se)], target_se,
+                                           on_error=lambda _, e: errors.append(e))
+                if errors:
+                    raise errors[0]
+
+            self.segments.set_status(idx, "clone", segments.STATUS_OK)
             print(f"✅ Segment {idx} success!")
 
         except Exception as e:
             error_msg = str(e)
             print(f"❌ Error: {error_msg}")
-            self.after(0, lambda m=error_msg: messagebox.showerror("Clone Error", m))
+            self.ui_bus.call(messagebox.showerror, "Clone Error", error_msg)
 
     threading.Thread(target=process_cloning, daemon=True).start()
 
@@ -701,319 +447,234 @@ def get_preset_list():
     return presets if presets else ["Default"]
 
 
-
-
-
-def add_queue_item(self, paragraph_text, available_presets):
-    # --- STEP 0: Snapshot data from main table ---
-    def get_main_cfg_snapshot():
-        return {
-            "speed": self.sliders_cfg["speed"]["widget"].get(),
-            "pitch": self.sliders_cfg["pitch"]["widget"].get(),
-            "volume": self.sliders_cfg["volume"]["widget"].get(),
-            "reverb": self.sliders_cfg["reverb"]["widget"].get(),
-            "bass": self.sliders_cfg["bass"]["widget"].get(),
-            "treble": self.sliders_cfg["treble"]["widget"].get(),
-            "echo": self.sliders_cfg["echo"]["widget"].get(),
-            "chorus": self.sliders_cfg["chorus"]["widget"].get(),
-            "threshold": self.sliders_cfg["thresh"]["widget"].get(),
-            "ratio": self.sliders_cfg["ratio"]["widget"].get(),
+def main_cfg_params(self):
+    """Snapshot of the main panel as (voice, sliders, switches) in queue-row naming"""
+    data = {
+        "sliders_cfg": {k: v["widget"].get() for k, v in self.sliders_cfg.items()},
+        "switches_cfg": {
             "limiter": self.cfg_limiter_sw.get() if hasattr(self, 'cfg_limiter_sw') else False,
             "normalize": self.cfg_normalize_sw.get() if hasattr(self, 'cfg_normalize_sw') else False,
             "gate": self.cfg_gate_sw.get() if hasattr(self, 'cfg_gate_sw') else False,
-            "voice": self.edge_voice_dropdown.get()
-        }
+        },
+        "voice": self.edge_voice_dropdown.get()
+    }
+    return engine.params_from_preset(data)
 
-    current_defaults = get_main_cfg_snapshot()
-    all_voices = self.edge_voice_dropdown.cget("values")
-
-    # --- 1. Main Container (Configure horizontal expansion) ---
-    item_container = ctk.CTkFrame(self.queue_frame, fg_color="#252525", corner_radius=8)
-    item_container.pack(fill="x", padx=10, pady=5)
-    item_container.grid_columnconfigure(0, weight=1) # Force content inside to expand
-
-    # --- 2. Header Row ---
-    header_frame = ctk.CTkFrame(item_container, fg_color="transparent")
-    header_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
-    header_frame.grid_columnconfigure(0, weight=1) # Text label takes up remaining space
-
-    short_text = (paragraph_text[:40] + '...') if len(paragraph_text) > 40 else paragraph_text
-    ctk.CTkLabel(header_frame, text=short_text, font=ctk.CTkFont(size=12)).grid(row=0, column=0, sticky="w")
-
-    local_widgets = {"sliders": {}, "switches": {}, "voice_dd": None}
-
-    # Logic Load Preset/Default (Keep your logic as is)
-    def on_item_preset_change(choice):
-        data = {}
-        if choice == "Default":
-            snapshot = get_main_cfg_snapshot()
-            data = {
-                "sliders_cfg": {k: v for k, v in snapshot.items() if k not in ["limiter", "normalize", "gate", "voice"]},
-                "switches_cfg": {"limiter": snapshot["limiter"], "normalize": snapshot["normalize"], "gate": snapshot["gate"]},
-                "voice": snapshot["voice"]
-            }
-        else:
-            try:
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                file_path = os.path.join(base_dir, "presets", f"{choice}.json")
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
-            except Exception as e: print(f"Error: {e}"); return
-
-        if data:
-            for k, val in data.get("sliders_cfg", {}).items():
-                key = "thresh" if k == "threshold" else k
-                if key in local_widgets["sliders"]:
-                    local_widgets["sliders"][key]["slider"].set(val)
-                    lbl_text = f"{int(val)}" if val > 10 or val < -10 else f"{val:.1f}"
-                    local_widgets["sliders"][key]["label"].configure(text=lbl_text)
-            for k, val in data.get("switches_cfg", {}).items():
-                if k in local_widgets["switches"]:
-                    if val: local_widgets["switches"][k].select()
-                    else: local_widgets["switches"][k].deselect()
-            if "voice" in data and local_widgets["voice_dd"]: local_widgets["voice_dd"].set(data["voice"])
-
-    # Preset Dropdown
-    preset_var = ctk.StringVar(value="Default")
-    preset_values = ["Default"] + [p for p in available_presets if p != "Default"]
-    preset_dd = ctk.CTkOptionMenu(header_frame, values=preset_values, variable=preset_var, 
-                                  width=100, height=24, font=ctk.CTkFont(size=10), command=on_item_preset_change)
-    preset_dd.grid(row=0, column=1, padx=5)
-
-    # Button group: Gen, Play, Save
-    btn_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
-    btn_frame.grid(row=0, column=2)
-    
-    # Initialize button list for later access
-    # Initialize button list for later access
-    local_widgets["buttons"] = {} 
-
-    # Fix loop to pass 'local_widgets' to Clone function and store Button object
-    for i, (text, key) in enumerate([
-        ("Gen", "gen"), 
-        ("▶", "play"), 
-        ("Clone", "clone"), 
-        ("💾", "save")
-    ]):
-        # Set corresponding command for each button
-        if key == "gen":
-            cmd = lambda t=paragraph_text, w=local_widgets: generate_one(self, t, w)
-        elif key == "play":
-            cmd = lambda t=paragraph_text: play_one(self, t)
-        elif key == "clone":
-            # IMPORTANT: Pass 'local_widgets' so clone function knows which button to recolor
-            cmd = lambda t=paragraph_text, w=local_widgets: clone_one(self, t, w)
-        else:
-            cmd = lambda t=paragraph_text: save_one(self, t)
 
-        # Create button
-        btn = ctk.CTkButton(btn_frame, text=text, width=32, height=24, command=cmd)
-        btn.grid(row=0, column=i, padx=1)
-        
-        # Save button to dict for later color/text changes
-        local_widgets["buttons"][key] = btn
-
-    # --- 3. Collapse Panel (Detail Frame) ---
-    detail_frame = ctk.CTkFrame(item_container, fg_color="#1e1e1e", corner_radius=4)
-    # Configure 2 columns for sliders, each takes 50%
-    detail_frame.grid_columnconfigure((0, 1), weight=1)
-
-    # Voice Row: force expansion to both sides
-    voice_frame = ctk.CTkFrame(detail_frame, fg_color="transparent")
-    voice_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
-    voice_frame.grid_columnconfigure(1, weight=1) # Dropdown will expand
-
-    voice_dd = ctk.CTkOptionMenu(voice_frame, values=all_voices, height=22, font=ctk.CTkFont(size=10))
-    voice_dd.set(current_defaults["voice"])
-    voice_dd.grid(row=0, column=1, sticky="ew", padx=2)
-    local_widgets["voice_dd"] = voice_dd
-
-    search_entry = ctk.CTkEntry(voice_frame, placeholder_text="Find...", width=80, height=22, font=ctk.CTkFont(size=10))
-    search_entry.grid(row=0, column=2, padx=5)
-    search_entry.bind("<KeyRelease>", lambda e: [voice_dd.configure(values=[v for v in all_voices if search_entry.get().lower() in v.lower()]), 
-                                                 voice_dd.set([v for v in all_voices if search_entry.get().lower() in v.lower()][0] if [v for v in all_voices if search_entry.get().lower() in v.lower()] else voice_dd.get())])
-
-    # --- 4. Create Local Sliders ---
-    def create_local_slider(parent, name1, min1, max1, def1, name2, min2, max2, def2, row_idx):
-        for name, mi, ma, de, col in [(name1, min1, max1, def1, 0), (name2, min2, max2, def2, 1)]:
-            f = ctk.CTkFrame(parent, fg_color="transparent")
-            f.grid(row=row_idx, column=col, sticky="ew", padx=5, pady=2)
-            f.grid_columnconfigure(1, weight=1) # Slider inside subframe will expand
-            
-            ctk.CTkLabel(f, text=f"{name}:", font=ctk.CTkFont(size=10), width=40, anchor="w").grid(row=0, column=0)
-            lbl = ctk.CTkLabel(f, text=f"{de:.1f}", font=ctk.CTkFont(size=10, weight="bold"), text_color="#3b8ed0", width=30)
-            lbl.grid(row=0, column=2, padx=2)
-            
-            s = ctk.CTkSlider(f, from_=mi, to=ma, height=12, command=lambda v, l=lbl: l.configure(text=f"{v:.1f}"))
-            s.set(de)
-            s.grid(row=0, column=1, sticky="ew")
-            local_widgets["sliders"][name.lower()] = {"slider": s, "label": lbl}
-
-    create_local_slider(detail_frame, "Speed", 0.5, 2.0, current_defaults["speed"], "Pitch", -50, 50, current_defaults["pitch"], 1)
-    create_local_slider(detail_frame, "Vol", 0, 250, current_defaults["volume"], "Rev", 0, 100, current_defaults["reverb"], 2)
-    create_local_slider(detail_frame, "Bass", 0, 15, current_defaults["bass"], "Treble", 0, 15, current_defaults["treble"], 3)
-    create_local_slider(detail_frame, "Echo", 0, 100, current_defaults["echo"], "Chorus", 0, 100, current_defaults["chorus"], 4)
-    create_local_slider(detail_frame, "Thresh", -60, 0, current_defaults["threshold"], "Ratio", 1, 20, current_defaults["ratio"], 5)
-
-    # --- 5. Switches Row: Fixed sticky="center" error ---
-    sw_frame = ctk.CTkFrame(detail_frame, fg_color="transparent")
-    sw_frame.grid(row=6, column=0, columnspan=2, sticky="ew", pady=5)
-    
-    # Divide 3 equal columns for switches to center themselves
-    sw_frame.grid_columnconfigure((0, 1, 2), weight=1) 
-
-    for i, (name, key) in enumerate([("Limiter", "limiter"), ("Normalize", "normalize"), ("Gate", "gate")]):
-        sw = ctk.CTkSwitch(sw_frame, text=name, font=ctk.CTkFont(size=10), width=0)
-        if current_defaults[key]: 
-            sw.select()
-        else: 
-            sw.deselect()
-            
-        # REMOVE sticky="center" -> Widget will automatically center in grid cell
-        sw.grid(row=0, column=i, padx=2) 
-        local_widgets["switches"][key] = sw
-
-    # Expand button ⚙
-    def toggle():
-        if detail_frame.winfo_viewable(): 
-            detail_frame.grid_forget()
-            exp.configure(text="⚙ ▼")
-        else: 
-            detail_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
-            exp.configure(text="⚙ ▲")
-    
-    exp = ctk.CTkButton(header_frame, text="⚙ ▼", width=40, height=24, fg_color="#333333", command=toggle)
-    exp.grid(row=0, column=3, padx=(5, 0))
+def add_queue_item(self, paragraph_text):
+    """Append one segment with the main panel settings; the queue view picks it up from the store"""
+    voice, sliders, switches = main_cfg_params(self)
+    return self.segments.add(paragraph_text, voice, sliders, switches)
+
 
-    item_container.paragraph_text = paragraph_text
-    item_container.local_widgets = local_widgets
+def apply_item_preset(self, seg, choice):
+    """Row preset dropdown: "Default" copies the main panel, anything else loads presets/{choice}.json"""
+    if choice == "Default":
+        params = main_cfg_params(self)
+    else:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        file_path = os.path.join(base_dir, "presets", f"{choice}.json")
+        if not os.path.exists(file_path):
+            return
+        try:
+            params = engine.load_preset(file_path)
+        except Exception as e:
+            print(f"Error: {e}")
+            return
 
-    return item_container
+    voice, sliders, switches = params
+    self.segments.update(seg.id, preset=choice, voice=voice, sliders=dict(sliders), switches=dict(switches))
 
-def generate_all(self):
+
+def generate_all(self, max_concurrency=None):
+    """
+    Generate every segment in the queue.
+    Keeps up to `max_concurrency` Edge-TTS requests in flight (GEN_MAX_CONCURRENCY by default);
+    each row's Gen button turns green as soon as its own segment is done.
+    """
     def run():
-        items = self.queue_frame.winfo_children()
+        items = self.segments.segments()
         if not items:
             return
 
         total = len(items)
-        count = 0
-        
-        # Disable main "Generate All" button to avoid multiple clicks
-        # (Assuming you have this button, if not skip)
-        
-        for index, item_container in enumerate(items):
-            if hasattr(item_container, "paragraph_text") and hasattr(item_container, "local_widgets"):
-                text = item_container.paragraph_text
-                widgets = item_container.local_widgets
-                
-                # generate_one will run sequentially for each segment inside this sub-thread
-                # prevents UI from freezing and updates button color immediately after each segment
-                result = generate_one(self, text, widgets)
-                
-                if result:
-                    count += 1
-            
+        workers = max(1, min(max_concurrency or GEN_MAX_CONCURRENCY, total))
+        print(f"🚀 Generating {total} segments ({workers} in flight)...")
+
+        # Each worker runs generate_one for one segment; the segment status is updated
+        # by generate_one itself, so the UI refreshes in completion order
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edge-tts") as pool:
+            futures = [pool.submit(generate_one, self, seg) for seg in items]
+            # Collect in queue order (not completion order)
+            results = [f.result() for f in futures]
+
+        self.generated_paths = results
+        count = sum(1 for r in results if r)
+
+        stats = tts_cache.get_stats()
+        print(f"📦 TTS cache: {stats['hits']} hits / {stats['misses']} misses ({stats['size_mb']} MB)")
+        chains = dsp.chain_pool.stats
+        print(f"🎛️ DSP chains: {chains['created']} built / {chains['reused']} reused")
+
         # When complete, show notification back on main thread
-        self.after(0, lambda: messagebox.showinfo("Notice", f"Completed generating {count}/{total} segments!"))
+        self.ui_bus.call(messagebox.showinfo, "Notice", f"Completed generating {count}/{total} segments!")
 
     # Start new thread
     threading.Thread(target=run, daemon=True).start()
 
 
 
+def generate_clone_all(self):
+    """
+    Generate + Clone as one pipeline: segments are cloned while the rest are still being synthesized.
+    Runs the file dialog here (Tk thread) before any work starts.
+    """
+    items = self.segments.segments()
+    if not items:
+        messagebox.showwarning("Notice", "List is empty!")
+        return
+
+    ref_path = ctk.filedialog.askopenfilename(
+        title="Choose common voice sample for the entire list",
+        filetypes=[("Audio", "*.wav *.mp3 *.m4a")]
+    )
+    if not ref_path: return
+
+    # Copy every segment's settings now, later edits in the UI don't affect the running batch
+    os.makedirs(self.segments.temp_dir, exist_ok=True)
+    jobs = []
+    for seg in items:
+        voice, p, sw = seg.params()
+        jobs.append(pipeline.make_segment(seg.id, seg.text, voice, p, sw, seg.audio_path))
+
+    button = getattr(self, "btn_gen_clone_all", None)
+    button_text = button.cget("text") if button else ""
+
+    def on_event(kind, idx, progress, error):
+        if kind == "generated":
+            self.segments.set_status(idx, "gen", segments.STATUS_OK)
+        elif kind == "cloned":
+            self.segments.set_status(idx, "clone", segments.STATUS_OK)
+        else:
+            print(f"❌ Error processing segment {idx}: {str(error)}")
+
+        # Per-stage progress on the button itself (one key: only the newest count is drawn each frame)
+        label = f"TTS {progress['generated']}/{progress['total']} · Clone {progress['cloned']}/{progress['total']}"
+        if button:
+            self.ui_bus.post("gen_clone_progress", lambda: button.configure(text=label))
+
+    def run():
+        processed_dir = 'temp/processed'
+        os.makedirs(processed_dir, exist_ok=True)
+        try:
+            with voice_model.use() as model:
+                target_se = se_cache.get_se(ref_path, model, target_dir=processed_dir, vad=True)
+                print(f"🚀 [Pipeline] Generate + Clone {len(jobs)} segments "
+                      f"({GEN_MAX_CONCURRENCY} TTS workers, queue {pipeline.QUEUE_SIZE})...")
+                result = pipeline.run(jobs, model, target_se, gen_workers=GEN_MAX_CONCURRENCY, on_event=on_event)
+        except Exception as e:
+            self.ui_bus.call(messagebox.showerror, "AI Error", f"Pipeline failed: {e}")
+            return
+        finally:
+            if button:
+                # Same key as the progress updates, so a late progress label can't overwrite the reset
+                self.ui_bus.post("gen_clone_progress", lambda: button.configure(text=button_text))
+
+        print(f"✨ [Pipeline] {result['cloned']}/{result['total']} cloned, {result['failed']} failed "
+              f"in {result['elapsed_sec']}s")
+        self.ui_bus.call(messagebox.showinfo,
+                         "Complete", f"Generated and cloned {result['cloned']}/{result['total']} segments!")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
 def clone_all(self):
     """
     Function to Clone entire list in queue.
     Coordinates with clone_one logic but optimizes Model loading.
+    Runs the file dialog here (Tk thread); the cloning itself runs on a worker thread.
     """
-    def run():
-        # 1. Get list of segments
-        items = self.queue_frame.winfo_children()
-        if not items:
-            self.after(0, lambda: messagebox.showwarning("Notice", "List is empty!"))
-            return
+    # 1. Get list of segments
+    items = self.segments.segments()
+    if not items:
+        messagebox.showwarning("Notice", "List is empty!")
+        return
 
-        # 2. Request common voice sample
-        ref_path = ctk.filedialog.askopenfilename(
-            title="Choose common voice sample for the entire list", 
-            filetypes=[("Audio", "*.wav *.mp3 *.m4a")]
-        )
-        if not ref_path: return
+    # 2. Request common voice sample
+    ref_path = ctk.filedialog.askopenfilename(
+        title="Choose common voice sample for the entire list", 
+        filetypes=[("Audio", "*.wav *.mp3 *.m4a")]
+    )
+    if not ref_path: return
 
-        # 3. Initialize Model once (Save time)
-        print("📦 [Batch] Loading OpenVoice Model...")
-        ckpt_dir = os.path.abspath("checkpoints_v2/converter")
+    def run():
+        # 3. Shared resident model (already loaded if warm-up or an earlier clone ran)
         processed_dir = 'temp/processed'
         os.makedirs(processed_dir, exist_ok=True)
         
         try:
-            # 'device' variable taken from config at top of cfg.py
-            model = ToneColorConverter(os.path.join(ckpt_dir, 'config.json'), device=device)
-            model.load_ckpt(os.path.join(ckpt_dir, 'checkpoint.pth'))
-            
-            # Extract sample voice SE once
-            target_se, _ = se_extractor.get_se(ref_path, vc_model=model, target_dir=processed_dir, vad=True)
+            with voice_model.use() as model:
+                # Extract sample voice SE once (or load it from the SE cache)
+                target_se = se_cache.get_se(ref_path, model, target_dir=processed_dir, vad=True)
         except Exception as e:
-            self.after(0, lambda m=str(e): messagebox.showerror("AI Error", f"Could not load model: {m}"))
+            self.ui_bus.call(messagebox.showerror, "AI Error", f"Could not load model: {e}")
             return
 
-        # 4. Iterate through each segment
-        for index, item_container in enumerate(items):
-            idx = index + 1
-            if hasattr(item_container, "paragraph_text") and hasattr(item_container, "local_widgets"):
-                widgets = item_container.local_widgets
-                source_path = os.path.abspath(f"temp/{idx}.wav")
-                
-                # Skip if no WAV file (Gen not clicked yet)
-                if not os.path.exists(source_path):
-                    print(f"⏩ Segment {idx} no source file, skipping.")
-                    continue
-
+        # 4. Collect segments and group them by how they were generated
+        # Same voice + rate + pitch + DSP chain -> same source voice pattern
+        jobs = []    # (idx, source_path, group_key)
+        groups = {}  # group_key -> [source_path, ...]
+        for seg in items:
+            idx = seg.id
+            source_path = seg.audio_path
+
+            # Skip if no WAV file (Gen not clicked yet)
+            if not os.path.exists(source_path):
+                print(f"⏩ Segment {idx} no source file, skipping.")
+                continue
+
+            # Already cloned: its file holds the target voice, it would skew the group's source SE
+            if seg.status["clone"] == segments.STATUS_OK:
+                print(f"⏩ Segment {idx} already cloned, skipping.")
+                continue
+
+            key = clone_engine.source_group_key(*seg.params())
+            jobs.append((idx, source_path, key))
+            groups.setdefault(key, []).append(source_path)
+
+        # Hold the shared model for the whole batch so the idle unloader leaves it alone
+        with voice_model.use() as model:
+            # 5. One source SE per group (pooled audio), not one per segment
+            group_se = {}
+            for n, (key, paths) in enumerate(groups.items(), 1):
                 try:
-                    print(f"🧬 [Batch] Processing segment {idx}...")
-                    
-                    # --- Coordination logic same as clone_one ---
-                    # Fix too short audio error
-                    temp_se_path = os.path.abspath(f"temp/se_batch_src_{idx}.wav")
-                    audio_src = AudioSegment.from_file(source_path)
-                    (audio_src * 5).export(temp_se_path, format="wav")
-                    
-                    # Extract source SE
-                    source_se, _ = se_extractor.get_se(temp_se_path, vc_model=model, target_dir=processed_dir, vad=True)
-                    
-                    # Convert
-                    wav_output = os.path.abspath(f"temp/cloned_batch_{idx}.wav")
-                    model.convert(
-                        audio_src_path=source_path, 
-                        src_se=source_se,
-                        tgt_se=target_se,
-                        output_path=wav_output,
-                        tau=0.3
-                    )
-
-                    # Overwrite old file with cloned file
-                    if os.path.exists(wav_output):
-                        time.sleep(0.2)
-                        if os.path.exists(source_path): os.remove(source_path)
-                        os.rename(wav_output, source_path)
-                        
-                        # Delete temp SE file
-                        if os.path.exists(temp_se_path): os.remove(temp_se_path)
-
-                        # Update UI immediately for each row
-                        def update_ui(w=widgets):
-                            if "clone" in w["buttons"]:
-                                w["buttons"]["clone"].configure(fg_color="#6f42c1", text="Cloned")
-                            if "gen" in w["buttons"]:
-                                w["buttons"]["gen"].configure(fg_color="#28a745", text="AI-Gen")
-                        self.after(0, update_ui)
-
+                    print(f"🧬 [Batch] Source voice pattern {n}/{len(groups)}: {key[0]} ({len(paths)} segments)...")
+                    group_se[key] = clone_engine.pooled_source_se(model, paths)
                 except Exception as e:
-                    print(f"❌ Error processing segment {idx}: {str(e)}")
-                    continue
+                    print(f"❌ Error extracting source voice pattern for {key[0]}: {str(e)}")
+
+            # 6. Convert in batches (several segments per forward pass), each with its group's source SE
+            convert_jobs = [(idx, source_path, source_path, group_se[key])
+                            for idx, source_path, key in jobs if key in group_se]
+            print(f"🚀 [Batch] Converting {len(convert_jobs)} segments (batch size {clone_engine.CONVERT_BATCH_SIZE})...")
+
+            def on_done(idx):
+                print(f"✅ [Batch] Segment {idx} cloned")
+
+                # Update UI immediately for each row
+                self.segments.set_status(idx, "clone", segments.STATUS_OK)
 
-        self.after(0, lambda: messagebox.showinfo("Complete", "Cloned entire list successfully!"))
+            def on_error(idx, e):
+                print(f"❌ Error processing segment {idx}: {str(e)}")
+
+            # VG_CLONE_WORKERS > 1: spread batches over worker processes (each with its own model)
+            workers = clone_workers.resolve_workers()
+            if workers > 1 and len(convert_jobs) > clone_engine.CONVERT_BATCH_SIZE:
+                clone_workers.convert_parallel(convert_jobs, target_se, workers, on_done=on_done, on_error=on_error)
+            else:
+                clone_engine.convert_files(model, convert_jobs, target_se, on_done=on_done, on_error=on_error)
+
+        self.ui_bus.call(messagebox.showinfo, "Complete", "Cloned entire list successfully!")
 
     # Run in separate thread to prevent UI freezing
     threading.Thread(target=run, daemon=True).start()
@@ -1024,43 +685,21 @@ def play_all(self):
     Play entire segment list in queue in order.
     Uses VLC media list to play sequentially without user clicking.
     """
-    import vlc
-    
     # 1. Get list of all items
-    items = self.queue_frame.winfo_children()
+    items = self.segments.segments()
     if not items:
         messagebox.showwarning("Notice", "No segments in queue!")
         return
 
     # 2. Create list of files to play
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    temp_dir = os.path.join(base_dir, "temp")
-    
-    playlist = []  # Contains (file_path, display_name, duration)
+    playlist = []  # Contains (file_path, display_name, duration); duration is probed when the track loads
     
-    for idx, item in enumerate(items, 1):
+    for pos, seg in enumerate(items, 1):
         # Find WAV or MP3 file (WAV priority)
-        file_path_wav = os.path.join(temp_dir, f"{idx}.wav")
-        file_path_mp3 = os.path.join(temp_dir, f"{idx}.mp3")
-        
-        final_path = None
-        if os.path.exists(file_path_wav):
-            final_path = file_path_wav
-        elif os.path.exists(file_path_mp3):
-            final_path = file_path_mp3
-        
+        final_path = seg.existing_audio()
         if final_path:
-            # Get paragraph_text from item if available
-            text = getattr(item, "paragraph_text", f"Segment {idx}")
-            display_name = f"Segment {idx}: {text[:20]}..."
-            
-            # Calculate duration
-            try:
-                y, sr = librosa.load(final_path, sr=None)
-                duration = librosa.get_duration(y=y, sr=sr)
-                playlist.append((final_path, display_name, duration))
-            except Exception as e:
-                print(f"⚠️ Error calculating duration for segment {idx}: {e}")
+            display_name = f"Segment {pos}: {seg.text[:20]}..."
+            playlist.append((final_path, display_name, None))
     
     if not playlist:
         messagebox.showwarning("Notice", "No audio files found!")
@@ -1091,7 +730,7 @@ def play_all(self):
 
 def save_all(self):
     """Lưu toàn bộ danh sách với tên file sạch (không dấu)"""
-    items = self.queue_frame.winfo_children()
+    items = self.segments.segments()
     if not items:
         messagebox.showwarning("Notice", "List is empty!")
         return
@@ -1108,34 +747,21 @@ def save_all(self):
         if not target_dir: return
         
         count = 0
-        for i, item in enumerate(items):
-            if hasattr(item, "paragraph_text"):
-                idx = i + 1
-                text_content = item.paragraph_text
-                
-                # Tìm file nguồn trong temp
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                temp_dir = os.path.join(base_dir, "temp")
-                src_path = None
-                for ext_type in [".wav", ".mp3"]:
-                    p = os.path.join(temp_dir, f"{idx}{ext_type}")
-                    if os.path.exists(p):
-                        src_path = p
-                        break
+        for idx, seg in enumerate(items, 1):
+            # Tìm file nguồn trong temp
+            src_path = seg.existing_audio()
+            if src_path:
+                ext = os.path.splitext(src_path)[1]
+                # Tạo tên file sạch: "SốTT_NoiDungKhongDau.wav"
+                clean_name = slugify_text(seg.text, 30)
+                file_name = f"{idx:02d}_{clean_name}{ext}"
                 
-                if src_path:
-                    ext = os.path.splitext(src_path)[1]
-                    # Tạo tên file sạch: "SốTT_NoiDungKhongDau.wav"
-                    clean_name = slugify_text(text_content, 30)
-                    file_name = f"{idx:02d}_{clean_name}{ext}"
-                    
-                    dest = os.path.join(target_dir, file_name)
-                    shutil.copy2(src_path, dest)
-                    count += 1
+                dest = os.path.join(target_dir, file_name)
+                shutil.copy2(src_path, dest)
+                count += 1
         messagebox.showinfo("Success", f"Saved {count} files successfully.")
 
     elif choice is False: # CHẾ ĐỘ THỦ CÔNG
-        for item in items:
-            if hasattr(item, "paragraph_text"):
-                # Gọi save_one sẽ tự động dùng logic tên không dấu mới
-                self.save_one(item.paragraph_text)
+        for seg in items:
+            # Gọi save_one sẽ tự động dùng logic tên không dấu mới
+            save_one(self, seg)
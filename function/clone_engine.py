@@ -0,0 +1,337 @@
+import os
+
+import numpy as np
+import soundfile as sf
+
+import function.audio_meta as audio_meta
+import function.dsp as dsp
+import function.engine as engine
+
+
+# --- CLONE ENGINE ---
+# Source-voice embedding and tone conversion helpers shared by Clone and Clone All.
+# torch / librosa / the converter backends are imported inside the functions (first clone),
+# so importing this module at app startup stays cheap. Must not import tkinter/customtkinter.
+
+# Seconds of a group's audio pooled into one source-SE extraction
+SE_POOL_SECONDS = float(os.environ.get("VG_SE_POOL_SECONDS", "60"))
+# Short input is repeated in memory up to this length ("audio too short" in OpenVoice's extractor)
+SE_MIN_SECONDS = float(os.environ.get("VG_SE_MIN_SECONDS", "15"))
+# Length of the pieces an embedding is averaged over (OpenVoice's VAD split uses ~10 s)
+SE_CHUNK_SECONDS = 10.0
+# Frames quieter than this (relative to the peak) are dropped before extraction
+SILENCE_DB = -40.0
+
+# Segments converted in one forward pass, and a cap on the audio per pass (seconds) to bound padding/memory
+CONVERT_BATCH_SIZE = max(1, int(os.environ.get("VG_CLONE_BATCH", "8")))
+CONVERT_BATCH_SECONDS = float(os.environ.get("VG_CLONE_BATCH_SECONDS", "120"))
+# Same tau the single-segment convert() calls use
+TAU = 0.3
+
+# Segments longer than this are converted in chunks (0 = never), bounding peak memory per pass
+CHUNK_SECONDS = float(os.environ.get("VG_CLONE_CHUNK_SECONDS", "30"))
+# Overlap on each side of a cut, crossfaded when the chunks are joined
+CHUNK_OVERLAP_SECONDS = 0.25
+# How far from the nominal chunk end to look for the quietest cut point
+CHUNK_SEARCH_SECONDS = 3.0
+
+
+def source_group_key(voice, p, sw):
+    """
+    Segments rendered with the same Edge voice, rate, pitch and DSP chain share one source SE.
+    Returns a hashable key.
+    """
+    rate_str, pitch_str = engine.tts_strings(p)
+    return voice, rate_str, pitch_str, dsp.DSPParams.from_dicts(p, sw)
+
+
+def pool_audio(paths, max_seconds=SE_POOL_SECONDS, min_seconds=SE_MIN_SECONDS):
+    """Concatenate mono audio from paths up to max_seconds, tiled to at least min_seconds -> (audio, sr)"""
+    parts, sr, total = [], None, 0
+    for path in paths:
+        y, file_sr = sf.read(path, dtype="float32", always_2d=True)
+        if sr is None:
+            sr = file_sr
+        elif file_sr != sr:
+            continue
+        y = y.mean(axis=1)
+        parts.append(y)
+        total += len(y)
+        if total >= max_seconds * sr:
+            break
+
+    if not parts:
+        raise ValueError("No audio to extract a voice pattern from")
+
+    audio = np.concatenate(parts)[:int(max_seconds * sr)]
+    if len(audio) < min_seconds * sr:
+        audio = np.tile(audio, int(np.ceil(min_seconds * sr / len(audio))))
+    return audio, sr
+
+
+def trim_silence(audio, sr, threshold_db=SILENCE_DB, frame_ms=30):
+    """Drop quiet frames (stands in for the VAD pass of se_extractor.get_se)"""
+    frame = max(1, int(sr * frame_ms / 1000))
+    n = len(audio) // frame
+    if n == 0:
+        return audio
+    frames = audio[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    peak = rms.max()
+    if peak <= 0:
+        return audio
+    keep = rms >= peak * 10 ** (threshold_db / 20)
+    return frames[keep].reshape(-1)
+
+
+def spectrogram(model, audio):
+    """Linear spectrogram exactly as ToneColorConverter computes it -> (1, bins, frames) on model.device"""
+    import torch
+    from openvoice_cli.mel_processing import spectrogram_torch
+
+    hps = model.hps
+    y = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).to(model.device).unsqueeze(0)
+    return spectrogram_torch(y, hps.data.filter_length, hps.data.sampling_rate,
+                             hps.data.hop_length, hps.data.win_length, center=False).to(model.device)
+
+
+def to_model_rate(model, audio, sr):
+    target_sr = model.hps.data.sampling_rate
+    if sr == target_sr:
+        return audio
+    import librosa
+    return librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
+
+
+def extract_se_from_array(model, audio, sr, min_seconds=SE_MIN_SECONDS):
+    """
+    Speaker embedding from in-memory samples (same math as ToneColorConverter.extract_se).
+    Silence is trimmed, short input is tiled in memory, and the reference encoder output
+    is averaged over ~10 s pieces. Returns a (1, gin_channels, 1) tensor.
+    """
+    import torch
+
+    audio = to_model_rate(model, np.asarray(audio, dtype=np.float32), sr)
+    sr = model.hps.data.sampling_rate
+
+    audio = trim_silence(audio, sr)
+    if len(audio) == 0:
+        raise ValueError("No speech found to extract a voice pattern from")
+    if len(audio) < min_seconds * sr:
+        audio = np.tile(audio, int(np.ceil(min_seconds * sr / len(audio))))
+
+    chunk = int(SE_CHUNK_SECONDS * sr)
+    pieces = [audio[i:i + chunk] for i in range(0, len(audio), chunk)]
+    # A short tail would be a noisy estimate on its own
+    if len(pieces) > 1 and len(pieces[-1]) < chunk // 2:
+        pieces[-2] = np.concatenate([pieces[-2], pieces.pop()])
+
+    gs = []
+    with torch.no_grad():
+        for piece in pieces:
+            spec = spectrogram(model, piece)
+            gs.append(model.model.ref_enc(spec.transpose(1, 2)).unsqueeze(-1))
+    return torch.stack(gs).mean(0)
+
+
+def pooled_source_se(model, paths):
+    """One source SE for a whole group, extracted in memory from a pooled sample of its segments"""
+    audio, sr = pool_audio(paths, min_seconds=0)
+    return extract_se_from_array(model, audio, sr)
+
+
+def source_se_from_file(model, path):
+    """Source SE of a single generated segment (no looped temp file)"""
+    audio, sr = sf.read(path, dtype="float32", always_2d=True)
+    return extract_se_from_array(model, audio.mean(axis=1), sr)
+
+
+def load_for_model(model, path):
+    """Mono float32 samples at the converter's sample rate (what ToneColorConverter.convert loads)"""
+    audio, sr = sf.read(path, dtype="float32", always_2d=True)
+    return to_model_rate(model, audio.mean(axis=1), sr)
+
+
+def convert_batch(model, audios, src_ses, tgt_se, tau=TAU):
+    """
+    Tone conversion of several segments in one voice_conversion() call.
+    Spectrograms are zero-padded to the longest one and masked through spec_lengths;
+    each output is cut back to its own length. Returns a list of float32 arrays.
+    """
+    import torch
+    import function.convert_backends as convert_backends
+
+    hop = model.hps.data.hop_length
+    specs = [spectrogram(model, a)[0] for a in audios]
+    lengths = [s.size(-1) for s in specs]
+
+    batch = torch.zeros(len(specs), specs[0].size(0), max(lengths), device=model.device)
+    for i, spec in enumerate(specs):
+        batch[i, :, :lengths[i]] = spec
+    spec_lengths = torch.LongTensor(lengths).to(model.device)
+    sid_src = torch.cat([se.to(model.device) for se in src_ses], dim=0)
+    sid_tgt = tgt_se.to(model.device).expand(len(specs), -1, -1)
+
+    # eager / torchscript / onnx (VG_CLONE_BACKEND)
+    out = convert_backends.get(model).run(batch, spec_lengths, sid_src, sid_tgt, tau)
+
+    results = []
+    for i, n in enumerate(lengths):
+        audio = out[i, 0, :n * hop].data.cpu().float().numpy()
+        # Same post step as convert() (no-op when the watermark model is disabled)
+        if hasattr(model, "add_watermark"):
+            audio = model.add_watermark(audio, "default")
+        results.append(audio)
+    return results
+
+
+def chunk_bounds(audio, sr, chunk_seconds=None, search_seconds=CHUNK_SEARCH_SECONDS, frame_ms=20):
+    """
+    Cut positions [0, c1, ..., len] roughly chunk_seconds apart, each moved to the quietest
+    20 ms frame within search_seconds of the nominal position (pauses between words/sentences).
+    """
+    n = len(audio)
+    chunk = int((CHUNK_SECONDS if chunk_seconds is None else chunk_seconds) * sr)
+    if chunk <= 0 or n <= chunk * 1.5:
+        return [0, n]
+
+    frame = max(1, int(sr * frame_ms / 1000))
+    # Capped at a quarter chunk: no chunk is ever longer than 1.25x chunk_seconds (+ overlap)
+    search = min(int(search_seconds * sr), chunk // 4)
+    cuts, pos = [0], 0
+    # Stop while at least half a chunk is left, so the last chunk is never a sliver
+    while n - pos > chunk * 1.5:
+        lo = max(pos + chunk // 2, pos + chunk - search)
+        hi = min(n - chunk // 2, pos + chunk + search)
+        frames = (hi - lo) // frame
+        if frames <= 0:
+            cut = pos + chunk
+        else:
+            window = audio[lo:lo + frames * frame].reshape(frames, frame)
+            energy = np.mean(window ** 2, axis=1)
+            # Latest of the quietest frames, so chunks stay close to the nominal length
+            cut = lo + (frames - 1 - int(np.argmin(energy[::-1]))) * frame + frame // 2
+        cuts.append(cut)
+        pos = cut
+    cuts.append(n)
+    return cuts
+
+
+def convert_chunked(model, audio, src_se, tgt_se, tau=TAU):
+    """
+    Convert a long segment chunk by chunk with the same SEs and crossfade the joins.
+    Only one chunk is in the model at a time, so peak memory doesn't grow with segment length.
+    """
+    sr = model.hps.data.sampling_rate
+    cuts = chunk_bounds(audio, sr)
+    if len(cuts) == 2:
+        return convert_batch(model, [audio], [src_se], tgt_se, tau)[0]
+
+    n = len(audio)
+    ov = int(CHUNK_OVERLAP_SECONDS * sr)
+    out = np.zeros(n, dtype=np.float32)
+    for i in range(len(cuts) - 1):
+        start, end = max(0, cuts[i] - ov), min(n, cuts[i + 1] + ov)
+        y = convert_batch(model, [audio[start:end]], [src_se], tgt_se, tau)[0]
+
+        # Output length follows the spectrogram frames, align it to the input span
+        seg = np.zeros(end - start, dtype=np.float32)
+        seg[:min(len(y), len(seg))] = y[:len(seg)]
+
+        # Linear ramps over the overlap around each cut; neighbouring ramps sum to 1
+        if i > 0:
+            ramp = min(2 * ov, len(seg))
+            seg[:ramp] *= np.linspace(0.0, 1.0, ramp, dtype=np.float32)
+        if i < len(cuts) - 2:
+            ramp = min(2 * ov, len(seg))
+            seg[len(seg) - ramp:] *= np.linspace(1.0, 0.0, ramp, dtype=np.float32)
+        out[start:end] += seg
+    return out
+
+
+def _write_atomic(path, audio, sr):
+    tmp_path = f"{path}.part.wav"
+    sf.write(tmp_path, audio, sr)
+    os.replace(tmp_path, path)
+
+
+def convert_files(model, jobs, tgt_se, batch_size=CONVERT_BATCH_SIZE, on_done=None, on_error=None):
+    """
+    Convert jobs [(job_id, src_path, out_path, src_se), ...] in length-sorted batches.
+    Batches are planned from header durations (audio_meta); samples are loaded one batch at a time,
+    so memory is bounded by a batch, not by the whole job list.
+    out_path may be src_path (a batch's sources are read before any of its outputs are written).
+    on_done(job_id) / on_error(job_id, exc) are called from this thread as items finish.
+    A failing batch is retried item by item so one bad file doesn't sink its neighbours.
+    """
+    sr = model.hps.data.sampling_rate
+    timed = []
+    for job in jobs:
+        try:
+            timed.append((job, audio_meta.duration(job[1])))
+        except Exception as e:
+            if on_error:
+                on_error(job[0], e)
+
+    # Long segments go through the chunked path on their own (bounded memory)
+    long_limit = CHUNK_SECONDS * 1.5 if CHUNK_SECONDS > 0 else float("inf")
+    long_jobs = [job for job, seconds in timed if seconds > long_limit]
+    timed = [(job, seconds) for job, seconds in timed if seconds <= long_limit]
+
+    # Similar lengths together -> little padding
+    timed.sort(key=lambda item: item[1])
+
+    batches, current, current_seconds = [], [], 0.0
+    for job, seconds in timed:
+        if current and (len(current) >= batch_size or current_seconds + seconds > CONVERT_BATCH_SECONDS):
+            batches.append(current)
+            current, current_seconds = [], 0.0
+        current.append(job)
+        current_seconds += seconds
+    if current:
+        batches.append(current)
+
+    def load(batch_jobs):
+        loaded = []
+        for job in batch_jobs:
+            try:
+                loaded.append((job, load_for_model(model, job[1])))
+            except Exception as e:
+                if on_error:
+                    on_error(job[0], e)
+        return loaded
+
+    def run(batch):
+        outputs = convert_batch(model, [a for _, a in batch], [job[3] for job, _ in batch], tgt_se)
+        for (job, _), audio in zip(batch, outputs):
+            _write_atomic(job[2], audio, sr)
+            if on_done:
+                on_done(job[0])
+
+    for long_job in long_jobs:
+        for job, audio in load([long_job]):
+            try:
+                _write_atomic(job[2], convert_chunked(model, audio, job[3], tgt_se), sr)
+                if on_done:
+                    on_done(job[0])
+            except Exception as e:
+                if on_error:
+                    on_error(job[0], e)
+
+    for batch_jobs in batches:
+        batch = load(batch_jobs)
+        if not batch:
+            continue
+        try:
+            run(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                if on_error:
+                    on_error(batch[0][0][0], e)
+                continue
+            for item in batch:
+                try:
+                    run([item])
+                except Exception as item_error:
+                    if on_error:
+                        on_error(item[0][0], item_error)
@@ -0,0 +1,80 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import function.clone_engine as clone_engine
+import function.voice_model as voice_model
+
+
+# --- MULTI-PROCESS CLONING ---
+# Clone All spread over a pool of worker processes, each holding its own ToneColorConverter.
+# Workers are started with "spawn", so everything they run lives in Tk-free modules.
+
+# Worker processes for Clone All: 1 = in-process (default), "auto" = one per 4 cores, or a number
+_workers_env = os.environ.get("VG_CLONE_WORKERS", "1").strip().lower()
+
+
+def resolve_workers(requested=None):
+    """Number of clone processes to use (1 on GPU, where one process already saturates the device)"""
+    if voice_model.get_device() != "cpu":
+        return 1
+    value = _workers_env if requested is None else str(requested)
+    cores = os.cpu_count() or 1
+    if value == "auto":
+        return max(1, cores // 4)
+    try:
+        return max(1, min(int(value), cores))
+    except ValueError:
+        return 1
+
+
+def _init_worker(threads):
+    """Per-process setup: divide torch threads between workers, load this worker's model"""
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    # The pool is shut down after the batch, no idle watchdog needed inside workers
+    voice_model.IDLE_UNLOAD_SEC = 0
+    voice_model.get_converter()
+
+
+def _convert_chunk(jobs, tgt_se):
+    """Runs inside a worker: convert a chunk, return [(job_id, error or None), ...] in chunk order"""
+    model = voice_model.get_converter()
+    errors = {}
+    done = set()
+    clone_engine.convert_files(model, jobs, tgt_se,
+                               on_done=done.add,
+                               on_error=lambda job_id, e: errors.__setitem__(job_id, str(e)))
+    return [(job[0], None if job[0] in done else errors.get(job[0], "not converted")) for job in jobs]
+
+
+def convert_parallel(jobs, tgt_se, workers, batch_size=clone_engine.CONVERT_BATCH_SIZE,
+                     on_done=None, on_error=None):
+    """
+    Same contract as clone_engine.convert_files, spread over `workers` processes.
+    Jobs are sent in batch-sized chunks; results are reported back in job order.
+    """
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    tgt_se = tgt_se.detach().cpu()
+    jobs = [(job_id, src, out, se.detach().cpu()) for job_id, src, out, se in jobs]
+    chunks = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+    print(f"💻 Cloning with {workers} processes x {threads} threads")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(_convert_chunk, chunk, tgt_se) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                results = [(job[0], str(e)) for job in chunk]
+            for job_id, error in results:
+                if error is None:
+                    if on_done:
+                        on_done(job_id)
+                elif on_error:
+                    on_error(job_id, RuntimeError(error))
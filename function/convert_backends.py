@@ -0,0 +1,218 @@
+import copy
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+import torch
+
+
+# --- CPU INFERENCE BACKENDS FOR THE TONE COLOR CONVERTER ---
+# The voice_conversion() forward pass can run as:
+#   eager        plain PyTorch (reference)
+#   torchscript  traced module (no Python dispatch per layer)
+#   onnx         ONNX Runtime export (needs the optional onnxruntime package)
+# Every non-eager backend is checked against eager output (tau=0) before use and falls back to
+# eager if it doesn't match. Must not import tkinter/customtkinter.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONNX_DIR = os.path.join(BASE_DIR, "cache", "onnx")
+
+# Backend used by Clone / Clone All / Gen + Clone
+BACKEND = os.environ.get("VG_CLONE_BACKEND", "eager").strip().lower()
+
+# Minimum signal-to-error ratio (dB) against eager output for a backend to be accepted
+PARITY_MIN_SNR_DB = {"torchscript": 60.0, "onnx": 50.0}
+
+_lock = threading.Lock()
+
+
+class _Conversion(torch.nn.Module):
+    """voice_conversion() as a plain forward(), so it can be traced / exported"""
+
+    def __init__(self, synth):
+        super().__init__()
+        self.synth = synth
+
+    def forward(self, spec, spec_lengths, sid_src, sid_tgt, tau):
+        return self.synth.voice_conversion(spec, spec_lengths, sid_src=sid_src, sid_tgt=sid_tgt, tau=tau)[0]
+
+
+def example_inputs(model, batch=1, seconds=2.0, seed=0):
+    """Random spectrogram batch + embeddings shaped like real converter inputs"""
+    from function import clone_engine
+
+    rng = np.random.default_rng(seed)
+    sr = model.hps.data.sampling_rate
+    audio = (rng.standard_normal(int(seconds * sr)) * 0.1).astype(np.float32)
+    spec = clone_engine.spectrogram(model, audio).expand(batch, -1, -1).contiguous()
+    lengths = torch.full((batch,), spec.size(-1), dtype=torch.long, device=model.device)
+    gin = model.hps.model.gin_channels if hasattr(model.hps, "model") else 256
+    gen = torch.Generator().manual_seed(seed)
+    sid_src = torch.randn(batch, gin, 1, generator=gen).to(model.device)
+    sid_tgt = torch.randn(batch, gin, 1, generator=gen).to(model.device)
+    return spec, lengths, sid_src, sid_tgt
+
+
+class EagerBackend:
+    name = "eager"
+
+    def __init__(self, model):
+        self.model = model
+        self.module = _Conversion(model.model).eval()
+
+    def run(self, spec, spec_lengths, sid_src, sid_tgt, tau):
+        """-> o_hat (batch, 1, samples) torch tensor"""
+        with torch.no_grad():
+            return self.module(spec, spec_lengths, sid_src, sid_tgt, torch.tensor(float(tau)))
+
+
+class TorchScriptBackend(EagerBackend):
+    name = "torchscript"
+
+    def __init__(self, model):
+        super().__init__(model)
+        spec, lengths, src, tgt = example_inputs(model)
+        with torch.no_grad():
+            self.module = torch.jit.trace(self.module, (spec, lengths, src, tgt, torch.tensor(0.3)),
+                                          check_trace=False)
+            self.module = torch.jit.freeze(self.module.eval())
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+
+        self.model = model
+        path = self._export(model)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = torch.get_num_threads()
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        # The exporter drops inputs the graph doesn't use
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    def _export(model):
+        """Export once per checkpoint; reuse the .onnx file afterwards"""
+        h = hashlib.sha256()
+        for name, tensor in model.model.state_dict().items():
+            h.update(name.encode("utf-8"))
+            h.update(tensor.detach().cpu().numpy().tobytes()[:4096])
+        path = os.path.join(ONNX_DIR, f"converter_{h.hexdigest()[:16]}.onnx")
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(ONNX_DIR, exist_ok=True)
+        module = _Conversion(copy.deepcopy(model.model).cpu()).eval()
+        spec, lengths, src, tgt = [t.cpu() for t in example_inputs(model)]
+        tmp_path = f"{path}.part"
+        print("📦 Exporting converter to ONNX (one time)...")
+        with torch.no_grad():
+            torch.onnx.export(
+                module, (spec, lengths, src, tgt, torch.tensor(0.3)), tmp_path,
+                input_names=["spec", "spec_lengths", "sid_src", "sid_tgt", "tau"],
+                output_names=["audio"],
+                dynamic_axes={"spec": {0: "batch", 2: "frames"}, "spec_lengths": {0: "batch"},
+                              "sid_src": {0: "batch"}, "sid_tgt": {0: "batch"}, "audio": {0: "batch", 2: "samples"}},
+                opset_version=17, dynamo=False,
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    def run(self, spec, spec_lengths, sid_src, sid_tgt, tau):
+        feeds = {
+            "spec": spec.detach().cpu().numpy().astype(np.float32),
+            "spec_lengths": spec_lengths.detach().cpu().numpy().astype(np.int64),
+            "sid_src": sid_src.detach().cpu().numpy().astype(np.float32),
+            "sid_tgt": sid_tgt.detach().cpu().numpy().astype(np.float32),
+            "tau": np.asarray(float(tau), dtype=np.float32),
+        }
+        feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+        return torch.from_numpy(self.session.run(["audio"], feeds)[0])
+
+
+BACKENDS = {
+    "eager": EagerBackend,
+    "torchscript": TorchScriptBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def parity_check(model, backend, reference=None, seconds=3.0):
+    """
+    Compare a backend with eager output on the same input (tau=0, so both are deterministic).
+    Uses a different length than the trace/export example so dynamic shapes are exercised too.
+    """
+    reference = reference or EagerBackend(model)
+    spec, lengths, src, tgt = example_inputs(model, batch=2, seconds=seconds, seed=1)
+    # Second item shorter than the first: padding + masking path
+    lengths[1] = max(1, int(lengths[1]) * 2 // 3)
+
+    expected = reference.run(spec, lengths, src, tgt, 0.0).float().cpu().numpy()
+    actual = backend.run(spec, lengths, src, tgt, 0.0).float().cpu().numpy()
+    if actual.shape != expected.shape:
+        return {"backend": backend.name, "ok": False, "error": f"shape {actual.shape} != {expected.shape}"}
+
+    err = actual - expected
+    noise = float(np.mean(err ** 2))
+    signal = float(np.mean(expected ** 2))
+    snr_db = 10 * np.log10(signal / noise) if noise > 0 else float("inf")
+    return {
+        "backend": backend.name,
+        "max_abs": float(np.max(np.abs(err))),
+        "snr_db": round(snr_db, 2),
+        "ok": snr_db >= PARITY_MIN_SNR_DB.get(backend.name, float("-inf")),
+    }
+
+
+def benchmark(model, backend, seconds=10.0, batch=1, repeat=3):
+    """Average forward time on `batch` x `seconds` of audio; rtf < 1 means faster than real time"""
+    spec, lengths, src, tgt = example_inputs(model, batch=batch, seconds=seconds)
+    backend.run(spec, lengths, src, tgt, 0.3)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        backend.run(spec, lengths, src, tgt, 0.3)
+    elapsed = (time.perf_counter() - t0) / repeat
+    return {"backend": backend.name, "elapsed_sec": round(elapsed, 4),
+            "rtf": round(elapsed / (seconds * batch), 4)}
+
+
+def build(model, name, check=True):
+    """Build a backend by name; non-eager ones must pass the parity check or eager is returned"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}' (choose from {', '.join(BACKENDS)})")
+    if name == "eager":
+        return EagerBackend(model)
+    if str(model.device) != "cpu":
+        print(f"⚠️ {name} backend is CPU only, using eager on {model.device}")
+        return EagerBackend(model)
+
+    try:
+        backend = BACKENDS[name](model)
+        if check:
+            result = parity_check(model, backend)
+            if not result["ok"]:
+                print(f"⚠️ {name} backend failed the parity check ({result}), using eager")
+                return EagerBackend(model)
+            print(f"✅ {name} backend ready (SNR vs eager {result['snr_db']} dB)")
+        return backend
+    except Exception as e:
+        print(f"⚠️ {name} backend unavailable ({e}), using eager")
+        return EagerBackend(model)
+
+
+def get(model, name=None):
+    """Backend for this converter instance (built once, kept on the model object)"""
+    name = (name or BACKEND).lower()
+    with _lock:
+        cache = model.__dict__.setdefault("_vg_backends", {})
+        if name not in cache:
+            cache[name] = build(model, name)
+        return cache[name]
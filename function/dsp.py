@@ -0,0 +1,276 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+import numpy as np
+from pedalboard import Pedalboard, Reverb, Delay, Chorus, LowShelfFilter, HighShelfFilter, Compressor, NoiseGate, Limiter
+
+
+# --- UNIFIED DSP ENGINE ---
+# One effect implementation for the Reference Editor, Preview and Gen/Generate All/CLI.
+# Same slider values -> same sound everywhere, and a single hot path to optimize.
+
+# Samples per processing block (~0.34 s at 24 kHz)
+BLOCK_SIZE = 8192
+
+# Normalize target (same headroom pydub.normalize used)
+NORMALIZE_PEAK = 10 ** (-0.1 / 20)
+
+# Chain pool limits: distinct parameter sets kept, idle chains kept per parameter set
+POOL_MAX_KEYS = 32
+POOL_MAX_IDLE_PER_KEY = 8
+# Idle pooled chains keep their output buffer only up to this many samples per channel
+# (~22 s at 24 kHz); a bigger one is dropped on checkin instead of staying pinned in the pool
+POOL_MAX_BUFFER_SAMPLES = BLOCK_SIZE * 64
+
+
+@dataclass(frozen=True)
+class DSPParams:
+    """
+    Effect settings shared by every call site.
+    Frozen (hashable) so identical settings can be used as a cache key.
+    """
+    speed: float = 1.0      # 0.5 - 2.0, only applied here when time_pitch=True
+    pitch: float = 0.0      # semitones, only applied here when time_pitch=True
+    vol: float = 100.0      # 0 - 250, gain of (vol - 100) / 5 dB
+    rev: float = 0.0        # 0 - 100
+    bass: float = 0.0       # 0 - 15 dB low shelf @ 250 Hz
+    treble: float = 0.0     # 0 - 15 dB high shelf @ 4 kHz
+    echo: float = 0.0       # 0 - 100 delay mix
+    chorus: float = 0.0     # 0 - 100 chorus mix
+    thresh: float = -20.0   # compressor threshold (dB)
+    ratio: float = 4.0      # compressor ratio
+    limiter: bool = False
+    normalize: bool = False
+    gate: bool = False
+    # Edge-TTS already applies speed/pitch at synthesis; set True for plain audio files (Reference Editor)
+    time_pitch: bool = False
+
+    @classmethod
+    def from_dicts(cls, p, sw=None, time_pitch=False):
+        """Build from queue-row style dicts (speed/pitch/vol/rev/... + limiter/normalize/gate)"""
+        sw = sw or {}
+
+        # Slider positions are rounded so "the same" setting always maps to the same pooled chain
+        def num(*keys, default):
+            for k in keys:
+                if k in p:
+                    return round(float(p[k]), 3)
+            return default
+
+        return cls(
+            speed=num("speed", default=1.0), pitch=num("pitch", default=0.0),
+            vol=num("vol", "volume", default=100.0), rev=num("rev", "reverb", default=0.0),
+            bass=num("bass", default=0.0), treble=num("treble", default=0.0),
+            echo=num("echo", default=0.0), chorus=num("chorus", default=0.0),
+            thresh=num("thresh", "threshold", default=-20.0), ratio=num("ratio", default=4.0),
+            limiter=bool(sw.get("limiter")), normalize=bool(sw.get("normalize")), gate=bool(sw.get("gate")),
+            time_pitch=time_pitch,
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def build_board(params):
+    """Pedalboard effect chain for the given settings"""
+    board = Pedalboard()
+
+    if params.gate:
+        board.append(NoiseGate(threshold_db=-40))
+
+    # EQ: Bass & Treble
+    board.append(LowShelfFilter(cutoff_frequency_hz=250, gain_db=params.bass))
+    board.append(HighShelfFilter(cutoff_frequency_hz=4000, gain_db=params.treble))
+
+    if params.chorus > 0:
+        board.append(Chorus(mix=params.chorus / 100))
+
+    if params.echo > 0:
+        board.append(Delay(delay_seconds=0.25, feedback=0.3, mix=params.echo / 100))
+
+    if params.rev > 0:
+        board.append(Reverb(room_size=params.rev / 100, wet_level=params.rev / 200))
+
+    # Compressor (Thresh & Ratio)
+    board.append(Compressor(threshold_db=params.thresh, ratio=params.ratio))
+
+    if params.limiter:
+        board.append(Limiter(threshold_db=-1.0))
+
+    return board
+
+
+def gain_factor(params):
+    """Linear gain of the volume slider"""
+    return np.float32(10 ** (((params.vol - 100) / 5) / 20))
+
+
+def apply_time_pitch(audio, sr, params):
+    """Speed / pitch stage for plain audio files (Edge-TTS audio gets these at synthesis)"""
+    if params.speed == 1.0 and params.pitch == 0:
+        return audio
+    from pedalboard import time_stretch
+    return time_stretch(audio, sr, stretch_factor=params.speed, pitch_shift_in_semitones=params.pitch)
+
+
+def as_2d(audio):
+    """(samples,) -> (1, samples) float32; (channels, samples) is kept as is"""
+    audio = np.asarray(audio, dtype=np.float32)
+    return audio[None, :] if audio.ndim == 1 else audio
+
+
+class DSPProcessor:
+    """
+    Block-based processor for one parameter set.
+    - process(): whole buffer, output allocated once and filled block by block
+    - process_block(): streaming use (preview), state carries across calls
+    """
+
+    def __init__(self, params, sr, block_size=BLOCK_SIZE):
+        self.params = params
+        self.sr = sr
+        self.block_size = block_size
+        self.board = build_board(params)
+        self.gain = gain_factor(params)
+        self._out = None
+
+    def reset(self):
+        self.board.reset()
+
+    def _run_blocks(self, audio, out):
+        """Feed audio through the board in blocks, writing results into out (same shape)"""
+        n = audio.shape[1]
+        for start in range(0, n, self.block_size):
+            end = min(start + self.block_size, n)
+            out[:, start:end] = self.board.process(audio[:, start:end], self.sr, reset=False)
+
+    def _output_buffer(self, shape):
+        """Reuse one output buffer across calls, grow it only when a longer input arrives"""
+        channels, n = shape
+        if self._out is None or self._out.shape[0] != channels or self._out.shape[1] < n:
+            self._out = np.empty((channels, max(n, self.block_size)), dtype=np.float32)
+        return self._out[:, :n]
+
+    def release_buffer(self, max_samples=0):
+        """Drop the reusable output buffer if it is longer than max_samples"""
+        if self._out is not None and self._out.shape[1] > max_samples:
+            self._out = None
+
+    def process(self, audio):
+        """
+        Full chain on a complete buffer; returns float32 (channels, samples).
+        The result is a view of this processor's reusable buffer: write it out or copy it
+        before the next process() call on the same processor.
+        """
+        audio = as_2d(audio)
+        if self.params.time_pitch:
+            audio = as_2d(apply_time_pitch(audio, self.sr, self.params))
+
+        self.reset()
+        out = self._output_buffer(audio.shape)
+        self._run_blocks(audio, out)
+
+        # --- VOLUME & NORMALIZE (in place on the output buffer) ---
+        if self.gain != 1.0:
+            out *= self.gain
+        if self.params.normalize:
+            normalize(out)
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+    def process_block(self, block):
+        """
+        Streaming chain for one block (no time/pitch stage).
+        Normalize is skipped: the global peak is unknown until the end, and scaling by a running
+        peak blows a quiet first block (MP3 lead-in noise) up to full scale. Apply normalize()
+        to the assembled result instead.
+        """
+        block = as_2d(block)
+        out = self.board.process(block, self.sr, reset=False)
+        if self.gain != 1.0:
+            out *= self.gain
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+
+def normalize(out):
+    """Scale a float32 buffer in place so its peak hits NORMALIZE_PEAK"""
+    peak = float(np.max(np.abs(out))) if out.size else 0.0
+    if peak > 0:
+        out *= np.float32(NORMALIZE_PEAK / peak)
+    return out
+
+
+class ChainPool:
+    """
+    Pool of constructed DSPProcessors keyed by (parameter set, sample rate).
+    A batch where 200 segments share one preset builds the Pedalboard chain once per worker
+    instead of once per segment. Chains are reset on checkout and on return, and a chain is
+    only ever held by one thread at a time.
+    """
+
+    def __init__(self, max_keys=POOL_MAX_KEYS, max_idle_per_key=POOL_MAX_IDLE_PER_KEY):
+        self.max_keys = max_keys
+        self.max_idle_per_key = max_idle_per_key
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0}
+
+    def checkout(self, params, sr):
+        key = (params, sr)
+        proc = None
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                proc = idle.pop()
+                self._idle.move_to_end(key)
+                self.stats["reused"] += 1
+            else:
+                self.stats["created"] += 1
+        if proc is None:
+            proc = DSPProcessor(params, sr)
+        proc.reset()
+        return proc
+
+    def checkin(self, proc):
+        proc.reset()
+        # One long script must not leave a huge buffer behind in every idle chain
+        proc.release_buffer(POOL_MAX_BUFFER_SAMPLES)
+        key = (proc.params, proc.sr)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self.max_idle_per_key:
+                idle.append(proc)
+            # Drop least recently used parameter sets
+            while len(self._idle) > self.max_keys:
+                self._idle.popitem(last=False)
+
+    @contextmanager
+    def borrow(self, params, sr):
+        proc = self.checkout(params, sr)
+        try:
+            yield proc
+        finally:
+            self.checkin(proc)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+
+# Process-wide pool shared by Gen, Generate All, Preview, Reference Editor and the CLI
+chain_pool = ChainPool()
+
+
+def borrow(params, sr):
+    """with dsp.borrow(params, sr) as proc: ... (use proc's output before leaving the block)"""
+    return chain_pool.borrow(params, sr)
+
+
+def process(audio, sr, params):
+    """One-shot helper: full chain on a complete buffer using a pooled chain (returns a private copy)"""
+    with borrow(params, sr) as proc:
+        return proc.process(audio).copy()
@@ -0,0 +1,174 @@
+# --- HEADLESS RENDER ENGINE ---
+# Same Edge-TTS -> Pedalboard -> volume/normalize chain as the "Gen" button, driven by plain dicts
+# instead of CTk widgets. Must not import tkinter/customtkinter (used by cli.py on display-less hosts).
+import io
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pedalboard.io import AudioFile
+import soundfile as sf
+
+import function.audio_meta as audio_meta
+import function.dsp as dsp
+import function.tts_cache as tts_cache
+import function.tts_loop as tts_loop
+
+
+# Queue-row slider values ("Default" row = main panel defaults in app.py)
+DEFAULT_SLIDERS = {
+    "speed": 1.0, "pitch": 0, "vol": 100, "rev": 0,
+    "bass": 0, "treble": 0, "echo": 0, "chorus": 0,
+    "thresh": -20.0, "ratio": 4.0
+}
+DEFAULT_SWITCHES = {"limiter": False, "normalize": False, "gate": False}
+DEFAULT_VOICE = "vi-VN-HoaiMyNeural"
+
+# Preset files store main-panel slider names, queue rows use the short ones
+_PRESET_KEY_MAP = {"volume": "vol", "reverb": "rev", "threshold": "thresh"}
+
+
+def load_preset(path):
+    """
+    Read a preset JSON (same format save_preset writes) into (voice, sliders, switches).
+    Missing values fall back to the app defaults.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return params_from_preset(data)
+
+
+def params_from_preset(data):
+    sliders = dict(DEFAULT_SLIDERS)
+    for k, val in data.get("sliders_cfg", {}).items():
+        key = _PRESET_KEY_MAP.get(k, k)
+        if key in sliders:
+            sliders[key] = float(val)
+
+    switches = dict(DEFAULT_SWITCHES)
+    for k, val in data.get("switches_cfg", {}).items():
+        if k in switches:
+            switches[k] = bool(val)
+
+    voice = data.get("voice") or DEFAULT_VOICE
+    return voice, sliders, switches
+
+
+def split_paragraphs(raw_content):
+    """One segment per non-empty line (same rule as "Split Text to Queue")"""
+    return [p.strip() for p in raw_content.split("\n") if p.strip()]
+
+
+def slugify_text(text, length=30):
+    """
+    Chuyển văn bản thành không dấu, loại bỏ ký tự đặc biệt để làm tên file.
+    """
+    if not text:
+        return ""
+
+    # 1. Chuyển Unicode dựng sẵn về dạng tổ hợp (NFD) để tách dấu
+    # Ví dụ: "ế" sẽ thành "ê" + "ˊ"
+    text = unicodedata.normalize('NFD', text)
+
+    # 2. Loại bỏ các ký tự dấu (Non-spacing Mark)
+    text = "".join([c for c in text if unicodedata.category(c) != 'Mn'])
+
+    # 3. Chuyển chữ "đ" sang "d" (vì bước trên không xử lý được chữ đ/Đ)
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+
+    # 4. Loại bỏ ký tự đặc biệt, chỉ giữ lại chữ cái, số và khoảng trắng
+    clean_text = re.sub(r'[\\/*?:"<>|]', "", text)
+
+    # 5. Cắt 30 ký tự đầu và xóa khoảng trắng thừa ở 2 đầu
+    return clean_text[:length].strip()
+
+
+def tts_strings(p):
+    """Edge-TTS rate/pitch strings from slider values"""
+    speed_str = f"{int((p['speed'] - 1.0) * 100):+}%"
+    pitch_str = f"{int(p['pitch']):+}Hz"
+    return speed_str, pitch_str
+
+
+def decode_audio_bytes(data):
+    """Decode compressed audio (Edge-TTS MP3) from memory -> float32 (channels, samples), sample rate"""
+    with AudioFile(io.BytesIO(data)) as f:
+        return f.read(f.frames), f.samplerate
+
+
+def render_segment(text, voice, p, sw, final_path):
+    """
+    Render one segment to final_path (16-bit WAV).
+    Edge-TTS bytes (through the TTS cache) -> in-memory decode -> unified DSP engine
+    -> one single write. No intermediate files.
+    """
+    # --- STEP 1: SPEECH GENERATION (EDGE-TTS) ---
+    speed_str, pitch_str = tts_strings(p)
+    # Volume is applied after DSP, so the request always uses Edge's default volume
+    mp3_bytes = tts_loop.run(tts_cache.fetch_tts_bytes(text, voice, speed_str, pitch_str, "+0%"))
+
+    # --- STEP 2: DECODE IN MEMORY ---
+    audio_data, sr = decode_audio_bytes(mp3_bytes)
+
+    # --- STEP 3: EFFECTS, VOLUME & NORMALIZE (POOLED DSP CHAIN) ---
+    with dsp.borrow(dsp.DSPParams.from_dicts(p, sw), sr) as proc:
+        processed_audio = proc.process(audio_data)
+
+        # --- STEP 4: SINGLE OUTPUT WRITE (before the chain and its buffer go back to the pool) ---
+        sf.write(final_path, processed_audio.T, sr, subtype="PCM_16")
+        audio_meta.record(final_path, processed_audio.shape[1], sr, processed_audio.shape[0])
+
+    return final_path
+
+
+def render_script(paragraphs, voice, p, sw, out_dir, workers=4, on_done=None):
+    """
+    Render every paragraph with a worker pool and write manifest.json into out_dir.
+    on_done(index, entry) is called from worker threads as each segment finishes.
+    Returns the manifest dict (segments in script order).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    def work(index, text):
+        clean_name = slugify_text(text, 30) or f"segment_{index}"
+        final_path = os.path.join(out_dir, f"{index:03d}_{clean_name}.wav")
+        entry = {"index": index, "text": text, "output": os.path.basename(final_path)}
+        t0 = time.perf_counter()
+        try:
+            render_segment(text, voice, p, sw, final_path)
+            entry["status"] = "ok"
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+        entry["elapsed_sec"] = round(time.perf_counter() - t0, 3)
+        if on_done:
+            on_done(index, entry)
+        return entry
+
+    workers = max(1, min(workers, len(paragraphs) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") as pool:
+        futures = [pool.submit(work, i, text) for i, text in enumerate(paragraphs, 1)]
+        segments = [f.result() for f in futures]
+
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "voice": voice,
+        "sliders": p,
+        "switches": sw,
+        "workers": workers,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+        "ok": sum(1 for s in segments if s["status"] == "ok"),
+        "failed": sum(1 for s in segments if s["status"] != "ok"),
+        "tts_cache": tts_cache.get_stats(),
+        "dsp_chains": dict(dsp.chain_pool.stats),
+        "segments": segments,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+
+    return manifest
@@ -0,0 +1,138 @@
+import os
+import shutil
+import threading
+
+
+# --- LRU FILE DIRECTORY ---
+# One file per key in a directory, capped by total bytes and/or entry count. Shared by the
+# Edge-TTS cache (tts_cache) and the speaker embedding cache (se_cache).
+
+# Eviction trims down to this share of a cap, so a full cache isn't rescanned on every new entry
+EVICT_TO_FRACTION = 0.9
+
+
+class LRUDir:
+    """
+    Entries are <cache_dir>/<key><suffix>. A hit touches the file's mtime, so eviction removes
+    the least recently used entries first. Size and count are kept as running totals; the
+    directory is only rescanned once a cap is passed. Blocking file IO throughout.
+    """
+
+    def __init__(self, cache_dir, suffix, max_bytes=None, max_entries=None):
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # Running (bytes, entries) of the directory, None until the first scan
+        self._totals = None
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def lookup(self, key):
+        """Path of the entry for key, or None (updates hit/miss counters)"""
+        path = self.path(key)
+        with self._lock:
+            if not os.path.exists(path):
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            # Touch file so eviction works as LRU instead of FIFO
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return path
+
+    def _scan(self):
+        """[(mtime, size, path), ...] of every entry (caller holds _lock)"""
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    @staticmethod
+    def _over_cap(size, count, max_bytes, max_entries, fraction=1.0):
+        return ((max_bytes is not None and size > max_bytes * fraction)
+                or (max_entries is not None and count > max_entries * fraction))
+
+    def store(self, key, write):
+        """
+        Add an entry: write(tmp_path) creates the file under a private temp name, which is then
+        moved into place so readers never see a half-written entry. Returns the entry path.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        dest = self.path(key)
+        tmp_path = f"{dest}.{threading.get_ident()}.part"
+        write(tmp_path)
+        size = os.path.getsize(tmp_path)
+
+        with self._lock:
+            try:
+                replaced = os.path.getsize(dest)
+            except OSError:
+                replaced = None
+            os.replace(tmp_path, dest)
+            if self._totals is None:
+                entries = self._scan()
+                self._totals = (sum(e[1] for e in entries), len(entries))
+            else:
+                total, count = self._totals
+                if replaced is None:
+                    self._totals = (total + size, count + 1)
+                else:
+                    self._totals = (total + size - replaced, count)
+            over_cap = self._over_cap(*self._totals, self.max_bytes, self.max_entries)
+        if over_cap:
+            self.enforce()
+        return dest
+
+    def enforce(self, max_bytes=None, max_entries=None):
+        """Evict least recently used entries until the caps hold (down to EVICT_TO_FRACTION of them)"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_entries = self.max_entries if max_entries is None else max_entries
+
+        with self._lock:
+            entries = self._scan()
+            total, count = sum(e[1] for e in entries), len(entries)
+            if self._over_cap(total, count, max_bytes, max_entries):
+                # Oldest access time first
+                for _, size, path in sorted(entries):
+                    if not self._over_cap(total, count, max_bytes, max_entries, EVICT_TO_FRACTION):
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                        count -= 1
+                        self._stats["evictions"] += 1
+                    except OSError:
+                        pass
+            self._totals = (total, count)
+
+    def stats(self):
+        """Counters plus current entries / size in bytes"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = self._scan()
+        stats["entries"] = len(entries)
+        stats["size_bytes"] = sum(e[1] for e in entries)
+        return stats
+
+    def clear(self):
+        """Remove every entry and reset counters"""
+        with self._lock:
+            if os.path.isdir(self.cache_dir):
+                shutil.rmtree(self.cache_dir, ignore_errors=True)
+            for k in self._stats:
+                self._stats[k] = 0
+            self._totals = (0, 0)
@@ -9,6 +9,8 @@ import threading
 import function.ref as ref_func
 import function.master_player as master_logic
 import function.cfg as cfg_func
+import function.voice_catalog as voice_catalog
+import function.voice_model as voice_model
 
 
 # --- SLIDER CREATION FUNCTION WITH UPDATED DEFAULT VALUES ---
@@ -78,29 +80,25 @@ def on_closing(self):
             has_files = True
 
     # 3. If files exist, ask the user
+    # Segment audio is named by session id and is not reused by the next session, so it is
+    # never kept: the only choice is to clear temp and exit, or stay in the program
     if has_files:
         msg = "Temporary folder (temp) still contains audio data.\n\n" \
-              "Do you want to DELETE ALL of them before exiting?\n" \
-              "(Select 'No' to keep them for the next session)"
-        
-        # Yes/No/Cancel dialog
-        # Yes: Delete and exit | No: Keep and exit | Cancel: Stay in program
-        ans = messagebox.askyesnocancel("Confirm Exit", msg)
-        
-        if ans is True: # User selects YES
-            try:
-                shutil.rmtree(temp_dir) # Clear temp folder
-                os.makedirs(temp_dir)   # Recreate empty folder to avoid errors
-                print("✨ Temp folder cleared and program exited.")
-                self.destroy() # Close program
-            except Exception as e:
-                print(f"Error during clearing: {e}")
-                self.destroy()
-        elif ans is False: # User selects NO
-            print("💾 Data kept and program exited.")
-            self.destroy()
-        else: # User selects CANCEL
+              "It will be DELETED on exit (segment audio is not reused by the next session).\n" \
+              "Export anything you need with Save first.\n\n" \
+              "Exit now?"
+
+        # OK: Delete and exit | Cancel: Stay in program
+        if not messagebox.askokcancel("Confirm Exit", msg):
             return # Do nothing, return to program
+
+        try:
+            shutil.rmtree(temp_dir) # Clear temp folder
+            os.makedirs(temp_dir)   # Recreate empty folder to avoid errors
+            print("✨ Temp folder cleared and program exited.")
+        except Exception as e:
+            print(f"Error during clearing: {e}")
+        self.destroy() # Close program
     else:
         # If temp is empty, close without asking
         self.destroy()
@@ -133,8 +131,12 @@ def select_file(self):
     ref_func.select_file(self) 
 
 def play_ref_audio(self):
-    """Calls play function from ref.py"""
-    threading.Thread(target=ref_func.play_ref_audio, args=(self,), daemon=True).start()
+    """Calls play function from ref.py; widgets are read here on the Tk thread, DSP runs on a worker"""
+    params = ref_func.ref_params(self)
+    if params is None:
+        return
+    ref_path = getattr(self, 'current_ref_path', None)
+    threading.Thread(target=ref_func.play_ref_audio, args=(self, params, ref_path), daemon=True).start()
 
 def save_ref_audio(self):
     """Calls save function from ref.py"""
@@ -143,7 +145,7 @@ def save_ref_audio(self):
 #=================================== Master Player ===================================
 
 # --- COORDINATE FROM MASTER_PLAYER.PY ---
-def load_to_master(self, audio_path, display_name, duration):
+def load_to_master(self, audio_path, display_name, duration=None):
     master_logic.load_to_master(self, audio_path, display_name, duration)
 
 def start_master_playback(self):
@@ -208,19 +210,51 @@ def reset_cfg_parameters(self):
 
 
 def get_edge_voices(self):
-    """Intermediate function to fetch data from edgetts_func and store in App variable"""
-    try:
-        # Call the function from edgetts.py
-        voices = cfg_func.get_all_edge_voices()
-        
+    """
+    Build the voice list from the local catalog file straight away (no network wait).
+    If the catalog is missing or older than its TTL, it is refreshed in the background
+    and swapped into the UI when the download finishes.
+    """
+    voices, fetched_at = voice_catalog.load_catalog()
+
+    if voices:
         # IMPORTANT: Store in self so filter_voices has data to filter
-        self.all_voices = voices 
-        
-        return voices
-    except Exception as e:
-        print(f"Edge TTS connection error: {e}")
-        self.all_voices = ["vi-VN-HoaiMyNeural", "vi-VN-NamMinhNeural"]
-        return self.all_voices
+        self.voice_catalog = voices
+        self.all_voices = voice_catalog.voice_names(voices)
+    else:
+        self.voice_catalog = []
+        self.all_voices = list(voice_catalog.FALLBACK_VOICES)
+
+    if not voices or voice_catalog.is_stale(fetched_at):
+        voice_catalog.refresh_in_background(
+            on_done=lambda new_voices: self.ui_bus.call(apply_voice_catalog, self, new_voices),
+            on_error=lambda e: print(f"Edge TTS connection error: {e}")
+        )
+
+    return self.all_voices
+
+
+def apply_voice_catalog(self, voices):
+    """Swap a freshly downloaded catalog into the UI (runs on the Tk thread)"""
+    self.voice_catalog = voices
+    self.all_voices = voice_catalog.voice_names(voices)
+
+    if not hasattr(self, "edge_voice_dropdown"):
+        return
+
+    current = self.edge_voice_dropdown.get()
+    if self.search_entry.get().strip():
+        # Keep the user's active search applied to the new list
+        filter_voices(self, None)
+    else:
+        self.edge_voice_dropdown.configure(values=self.all_voices)
+
+    # Replace the placeholder selection if it is not a real voice anymore
+    if current not in self.all_voices and self.all_voices:
+        self.edge_voice_dropdown.set(self.all_voices[0])
+
+    print(f"✅ Voice catalog updated: {len(self.all_voices)} voices")
+
 
 def filter_voices(self, event):
     """Filter voices function: language code first, then name"""
@@ -276,8 +310,27 @@ def preview_voice(self):
 def process_text_to_queue(self):
     cfg_func.process_text_to_queue(self)
 
-def add_queue_item(self, text, preset_name):
-    cfg_func.add_queue_item(self, text, preset_name)
+def add_queue_item(self, text):
+    return cfg_func.add_queue_item(self, text)
+
+def generate_one(self, item):
+    """Row "Gen" runs off the Tk thread like "Generate All" does"""
+    threading.Thread(target=cfg_func.generate_one, args=(self, item), daemon=True).start()
+
+def play_one(self, item):
+    cfg_func.play_one(self, item)
+
+def clone_one(self, item):
+    cfg_func.clone_one(self, item)
+
+def save_one(self, item):
+    cfg_func.save_one(self, item)
+
+def apply_item_preset(self, item, choice):
+    cfg_func.apply_item_preset(self, item, choice)
+
+def get_preset_list(self):
+    return cfg_func.get_preset_list()
 
 def generate_all(self):
     cfg_func.generate_all(self)
@@ -285,6 +338,14 @@ def generate_all(self):
 def clone_all(self):
     cfg_func.clone_all(self)
 
+def generate_clone_all(self):
+    cfg_func.generate_clone_all(self)
+
+def warmup_clone_model(self):
+    """Load the OpenVoice converter in the background once the window is up (opt-in, VG_CLONE_WARMUP=1)"""
+    if voice_model.WARMUP_ON_START and not voice_model.is_loaded():
+        voice_model.warmup_in_background()
+
 def play_all(self):
     cfg_func.play_all(self)
 
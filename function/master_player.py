@@ -1,9 +1,14 @@
 import vlc
 import os
 
-def load_to_master(self, audio_path, display_name, duration):
-    """Load audio data and auto-play"""
+import function.audio_meta as audio_meta
+
+def load_to_master(self, audio_path, display_name, duration=None):
+    """Load audio data and auto-play (duration=None -> read from the file header)"""
     try:
+        if duration is None:
+            duration = audio_meta.duration(audio_path)
+
         media = self.instance.media_new(audio_path)
         self.player.set_media(media)
         
@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import function.audio_meta as audio_meta
+import function.clone_engine as clone_engine
+import function.engine as engine
+
+
+# --- GENERATE + CLONE PIPELINE ---
+# TTS workers (network bound) push finished segments into a bounded queue; the clone stage
+# (CPU bound) consumes it while synthesis continues. A full queue blocks the TTS workers
+# (backpressure), so memory stays flat and total time approaches the slower stage.
+# Must not import tkinter/customtkinter.
+
+# Finished-but-not-yet-cloned segments allowed to wait between the two stages
+QUEUE_SIZE = max(1, int(os.environ.get("VG_PIPELINE_QUEUE", "16")))
+
+_DONE = object()
+
+
+def make_segment(seg_id, text, voice, p, sw, path):
+    """One pipeline item (plain values, read from the widgets on the Tk thread beforehand)"""
+    return {"id": seg_id, "text": text, "voice": voice, "p": p, "sw": sw, "path": path,
+            "group": clone_engine.source_group_key(voice, p, sw)}
+
+
+def run(segments, model, tgt_se, gen_workers=4, queue_size=QUEUE_SIZE,
+        batch_size=clone_engine.CONVERT_BATCH_SIZE, on_event=None):
+    """
+    Render and clone every segment. on_event(kind, seg_id, progress, error) is called from
+    pipeline threads with kind in "generated" / "cloned" / "error"; progress is a snapshot dict
+    {"total", "generated", "cloned", "failed", "queued"}. Returns the final progress dict.
+    """
+    total = len(segments)
+    q = queue.Queue(maxsize=queue_size)
+    lock = threading.Lock()
+    progress = {"total": total, "generated": 0, "cloned": 0, "failed": 0, "queued": 0}
+    started = time.perf_counter()
+    # Set when the clone stage fails, so producers stop instead of blocking on a full queue forever
+    cancel = threading.Event()
+
+    def emit(kind, seg_id, error=None):
+        with lock:
+            if kind in progress:
+                progress[kind] += 1
+            elif kind == "error":
+                progress["failed"] += 1
+            progress["queued"] = q.qsize()
+            snapshot = dict(progress)
+        if on_event:
+            on_event(kind, seg_id, snapshot, error)
+
+    # --- STAGE 1: TTS PRODUCERS ---
+    def put(item):
+        """Blocks while the clone stage is behind; gives up once the pipeline is cancelled"""
+        while not cancel.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce(seg):
+        if cancel.is_set():
+            return
+        try:
+            engine.render_segment(seg["text"], seg["voice"], seg["p"], seg["sw"], seg["path"])
+            emit("generated", seg["id"])
+            put((seg, True))
+        except Exception as e:
+            emit("error", seg["id"], e)
+            put((seg, False))
+
+    def producers():
+        workers = max(1, min(gen_workers, total or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline-tts") as pool:
+            list(pool.map(produce, segments))
+        put(_DONE)
+
+    producer_thread = threading.Thread(target=producers, name="pipeline-producers", daemon=True)
+    producer_thread.start()
+
+    # --- STAGE 2: CLONE CONSUMER (this thread) ---
+    def consume():
+        remaining = {}
+        for seg in segments:
+            remaining[seg["group"]] = remaining.get(seg["group"], 0) + 1
+        waiting = {}       # group -> segments generated before the group's source SE exists
+        waiting_sec = {}   # group -> seconds of audio collected for the pooled SE
+        group_se = {}
+        ready = []         # convert jobs whose source SE is known
+
+        def flush():
+            if ready:
+                clone_engine.convert_files(model, list(ready), tgt_se, batch_size=batch_size,
+                                           on_done=lambda seg_id: emit("cloned", seg_id),
+                                           on_error=lambda seg_id, e: emit("error", seg_id, e))
+                ready.clear()
+
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                # Nothing new: don't sit on a partial batch while TTS is slow
+                flush()
+                continue
+            if item is _DONE:
+                break
+
+            seg, ok = item
+            key = seg["group"]
+            remaining[key] -= 1
+            if ok:
+                if key in group_se:
+                    ready.append((seg["id"], seg["path"], seg["path"], group_se[key]))
+                else:
+                    waiting.setdefault(key, []).append(seg)
+                    try:
+                        waiting_sec[key] = waiting_sec.get(key, 0.0) + audio_meta.duration(seg["path"])
+                    except Exception:
+                        pass
+
+            # Extract the group's source SE once enough of its audio exists (or the group is complete)
+            pending = waiting.get(key)
+            if key not in group_se and pending and (
+                    waiting_sec.get(key, 0.0) >= clone_engine.SE_POOL_SECONDS or remaining[key] == 0):
+                try:
+                    group_se[key] = clone_engine.pooled_source_se(model, [s["path"] for s in pending])
+                    ready.extend((s["id"], s["path"], s["path"], group_se[key]) for s in pending)
+                except Exception as e:
+                    for s in pending:
+                        emit("error", s["id"], e)
+                waiting[key] = []
+
+            if len(ready) >= batch_size:
+                flush()
+
+        flush()
+
+    try:
+        consume()
+    except BaseException:
+        # Unblock the producers, let the TTS pool wind down, then report the failure
+        cancel.set()
+        while producer_thread.is_alive():
+            try:
+                q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise
+
+    progress["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return progress
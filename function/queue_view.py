@@ -0,0 +1,361 @@
+import customtkinter as ctk
+
+
+# --- VIRTUALIZED PROCESSING QUEUE ---
+# Only the rows that fit on screen exist as widgets; they are re-bound to other segments while
+# scrolling. Segments live in the SegmentStore (segments.py), the view observes it, and the
+# ⚙ detail panel is built once, on the first expand, and moved to whichever row is open.
+
+# Height of one collapsed row including padding (px)
+ROW_HEIGHT = 40
+# Visible queue height with every row collapsed (px)
+VIEW_HEIGHT = 280
+# Approximate height of the ⚙ detail panel (px), used to know how many rows still fit
+DETAIL_HEIGHT = 260
+# Rows moved per mouse-wheel step
+WHEEL_ROWS = 3
+
+GEN_OK = ("#28a745", "#218838")
+GEN_ERROR = ("#dc3545", "#c82333")
+CLONED = "#6f42c1"
+
+SLIDER_LAYOUT = [
+    ("Speed", 0.5, 2.0, "Pitch", -50, 50),
+    ("Vol", 0, 250, "Rev", 0, 100),
+    ("Bass", 0, 15, "Treble", 0, 15),
+    ("Echo", 0, 100, "Chorus", 0, 100),
+    ("Thresh", -60, 0, "Ratio", 1, 20),
+]
+SWITCH_LAYOUT = [("Limiter", "limiter"), ("Normalize", "normalize"), ("Gate", "gate")]
+
+
+def short_text(text, length=40):
+    return (text[:length] + '...') if len(text) > length else text
+
+
+class QueueRow(ctk.CTkFrame):
+    """Header of one segment: text, preset, Gen / ▶ / Clone / 💾 and the ⚙ toggle"""
+
+    def __init__(self, view):
+        super().__init__(view.body, fg_color="#252525", corner_radius=8)
+        self.view = view
+        self.item = None
+        self._preset_values = None
+        self.grid_columnconfigure(0, weight=1)
+
+        self.label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12), anchor="w")
+        self.label.grid(row=0, column=0, sticky="w", padx=10, pady=5)
+
+        self.preset_var = ctk.StringVar(value="Default")
+        self.preset_dd = ctk.CTkOptionMenu(self, values=["Default"], variable=self.preset_var, width=100, height=24,
+                                           font=ctk.CTkFont(size=10), command=self._on_preset)
+        self.preset_dd.grid(row=0, column=1, padx=5)
+
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.grid(row=0, column=2)
+        self.buttons = {}
+        for i, (text, key) in enumerate([("Gen", "gen"), ("▶", "play"), ("Clone", "clone"), ("💾", "save")]):
+            btn = ctk.CTkButton(btn_frame, text=text, width=32, height=24, command=lambda k=key: self._on_action(k))
+            btn.grid(row=0, column=i, padx=1)
+            self.buttons[key] = btn
+        # Theme colors, restored when a recycled row shows a segment that isn't generated yet
+        self.default_colors = (self.buttons["gen"].cget("fg_color"), self.buttons["gen"].cget("hover_color"))
+
+        self.exp = ctk.CTkButton(self, text="⚙ ▼", width=40, height=24, fg_color="#333333",
+                                 command=lambda: self.view.toggle_detail(self.item))
+        self.exp.grid(row=0, column=3, padx=(5, 10))
+
+    def bind_item(self, item):
+        self.item = item
+        self.label.configure(text=short_text(item.text))
+        if self._preset_values is not self.view.preset_values:
+            self._preset_values = self.view.preset_values
+            self.preset_dd.configure(values=self._preset_values)
+        self.preset_var.set(item.preset)
+        self.exp.configure(text="⚙ ▲" if self.view.expanded is item else "⚙ ▼")
+        self.update_status()
+
+    def update_status(self):
+        """Button colors/text from the item's status (rows are recycled, so always set every field)"""
+        status = self.item.status
+        if status.get("gen") == "ok":
+            fg, hover = GEN_OK
+        elif status.get("gen") == "error":
+            fg, hover = GEN_ERROR
+        else:
+            fg, hover = self.default_colors
+        cloned = status.get("clone") == "ok"
+        self.buttons["gen"].configure(fg_color=fg, hover_color=hover, text="AI-Gen" if cloned else "Gen")
+        self.buttons["clone"].configure(fg_color=CLONED if cloned else self.default_colors[0],
+                                        text="Cloned" if cloned else "Clone")
+
+    def _on_action(self, key):
+        if self.item is not None:
+            self.view.callbacks[key](self.item)
+
+    def _on_preset(self, choice):
+        if self.item is not None:
+            self.view.callbacks["preset"](self.item, choice)
+            if self.view.expanded is self.item:
+                self.view.detail.bind_item(self.item)
+
+
+class DetailPanel(ctk.CTkFrame):
+    """Voice, sliders and switches of the expanded row; edits go through SegmentStore.update"""
+
+    def __init__(self, view):
+        super().__init__(view.body, fg_color="#1e1e1e", corner_radius=4)
+        self.view = view
+        self.item = None
+        self.all_voices = []
+        self.grid_columnconfigure((0, 1), weight=1)
+
+        voice_frame = ctk.CTkFrame(self, fg_color="transparent")
+        voice_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        voice_frame.grid_columnconfigure(1, weight=1)
+
+        self.voice_dd = ctk.CTkOptionMenu(voice_frame, values=[""], height=22, font=ctk.CTkFont(size=10),
+                                          command=self._on_voice)
+        self.voice_dd.grid(row=0, column=1, sticky="ew", padx=2)
+
+        self.search_entry = ctk.CTkEntry(voice_frame, placeholder_text="Find...", width=80, height=22,
+                                         font=ctk.CTkFont(size=10))
+        self.search_entry.grid(row=0, column=2, padx=5)
+        self.search_entry.bind("<KeyRelease>", self._on_search)
+
+        self.sliders = {}
+        for row_idx, (name1, min1, max1, name2, min2, max2) in enumerate(SLIDER_LAYOUT, 1):
+            for name, mi, ma, col in [(name1, min1, max1, 0), (name2, min2, max2, 1)]:
+                f = ctk.CTkFrame(self, fg_color="transparent")
+                f.grid(row=row_idx, column=col, sticky="ew", padx=5, pady=2)
+                f.grid_columnconfigure(1, weight=1)
+
+                ctk.CTkLabel(f, text=f"{name}:", font=ctk.CTkFont(size=10), width=40, anchor="w").grid(row=0, column=0)
+                lbl = ctk.CTkLabel(f, text="", font=ctk.CTkFont(size=10, weight="bold"), text_color="#3b8ed0", width=30)
+                lbl.grid(row=0, column=2, padx=2)
+
+                key = name.lower()
+                s = ctk.CTkSlider(f, from_=mi, to=ma, height=12,
+                                  command=lambda v, k=key, l=lbl: self._on_slider(k, v, l))
+                s.grid(row=0, column=1, sticky="ew")
+                self.sliders[key] = {"slider": s, "label": lbl}
+
+        sw_frame = ctk.CTkFrame(self, fg_color="transparent")
+        sw_frame.grid(row=len(SLIDER_LAYOUT) + 1, column=0, columnspan=2, sticky="ew", pady=5)
+        sw_frame.grid_columnconfigure((0, 1, 2), weight=1)
+        self.switches = {}
+        for i, (name, key) in enumerate(SWITCH_LAYOUT):
+            sw = ctk.CTkSwitch(sw_frame, text=name, font=ctk.CTkFont(size=10), width=0,
+                               command=lambda k=key: self._on_switch(k))
+            sw.grid(row=0, column=i, padx=2)
+            self.switches[key] = sw
+
+    def set_voices(self, voices):
+        if voices != self.all_voices:
+            self.all_voices = list(voices)
+            self.voice_dd.configure(values=self.all_voices or [""])
+
+    def bind_item(self, item):
+        self.item = item
+        self.set_voices(self.view.get_voices())
+        self.search_entry.delete(0, "end")
+        self.voice_dd.configure(values=self.all_voices or [""])
+        self.voice_dd.set(item.voice)
+        for key, w in self.sliders.items():
+            val = item.sliders.get(key, 0)
+            w["slider"].set(val)
+            w["label"].configure(text=f"{val:.1f}")
+        for key, sw in self.switches.items():
+            if item.switches.get(key):
+                sw.select()
+            else:
+                sw.deselect()
+
+    def _on_voice(self, choice):
+        if self.item is not None:
+            self.view.store.update(self.item.id, voice=choice)
+
+    def _on_search(self, event=None):
+        query = self.search_entry.get().lower()
+        matches = [v for v in self.all_voices if query in v.lower()]
+        self.voice_dd.configure(values=matches or [""])
+        if matches:
+            self.voice_dd.set(matches[0])
+            self._on_voice(matches[0])
+
+    def _on_slider(self, key, value, label):
+        label.configure(text=f"{value:.1f}")
+        if self.item is not None:
+            self.view.store.update(self.item.id, sliders={**self.item.sliders, key: value})
+
+    def _on_switch(self, key):
+        if self.item is not None:
+            self.view.store.update(self.item.id, switches={**self.item.switches, key: bool(self.switches[key].get())})
+
+
+class QueueView(ctk.CTkFrame):
+    """
+    Scrolls by whole rows: `first` is the index of the top segment, and the row pool only
+    grows to the number of rows that fit in the visible height.
+    callbacks: {"gen" | "play" | "clone" | "save": fn(segment), "preset": fn(segment, choice)}
+    Store changes reach the view through on_store_event, which must run on the Tk thread.
+    """
+
+    def __init__(self, master, store, callbacks, get_presets, get_voices, height=VIEW_HEIGHT, **kwargs):
+        super().__init__(master, fg_color="#1a1a1a", **kwargs)
+        self.store = store
+        self.view_height = height
+        self.callbacks = callbacks
+        self.get_presets = get_presets
+        self.get_voices = get_voices
+
+        self.items = []
+        self.first = 0
+        self.rows = []
+        self._row_by_id = {}
+        self.detail = None
+        self.expanded = None
+        self.preset_values = ["Default"]
+        self._slots = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # Fixed-size body: rows that don't fit are clipped instead of growing the frame
+        self.body = ctk.CTkFrame(self, fg_color="transparent", height=height)
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+        self.body.grid_propagate(False)
+        self._extra = 0
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(self.body, text="Queue is empty. Split a script to add segments.",
+                                        font=ctk.CTkFont(size=11), text_color="#777777")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_wheel, add="+")
+        self.refresh()
+
+    # --- DATA ---
+    def on_store_event(self, kind, segment=None):
+        if kind == "order":
+            self.set_items(self.store.segments())
+        else:
+            self.refresh_item(segment)
+
+    def set_items(self, items):
+        # Scroll position is kept (and clamped in refresh) so a re-split doesn't jump to the top
+        self.items = items
+        if self.expanded is not None and self.store.get(self.expanded.id) is not self.expanded:
+            self.expanded = None
+        self.preset_values = ["Default"] + [p for p in self.get_presets() if p != "Default"]
+        self.refresh()
+
+    def refresh_item(self, item):
+        """Repaint one segment if it's on screen (O(1): rows are indexed by segment id)"""
+        row = self._row_by_id.get(item.id)
+        if row is not None and row.item is item:
+            row.update_status()
+
+    # --- LAYOUT ---
+    def _capacity(self):
+        # The window may stretch the view beyond view_height; the detail panel adds its own space
+        height = max(self.view_height, int(self.body.winfo_height() / self._get_widget_scaling()) - self._extra)
+        return max(1, height // ROW_HEIGHT + 1)
+
+    def refresh(self):
+        # The open ⚙ panel makes the view taller instead of pushing rows out of sight
+        extra = DETAIL_HEIGHT if self.expanded is not None else 0
+        if extra != self._extra:
+            self._extra = extra
+            self.body.configure(height=self.view_height + extra)
+
+        # Last slot is only partly visible, so the list stops scrolling once the final row is whole
+        slots = self._capacity()
+        self._slots = slots
+        self.first = max(0, min(self.first, len(self.items) - (slots - 1)))
+
+        # Pool grows to what fits on screen, never to the number of segments
+        while len(self.rows) < min(slots, len(self.items)):
+            self.rows.append(QueueRow(self))
+
+        grid_row = 0
+        detail_shown = False
+        self._row_by_id = {}
+        for i, row in enumerate(self.rows):
+            index = self.first + i
+            if i < slots and index < len(self.items):
+                item = self.items[index]
+                row.bind_item(item)
+                self._row_by_id[item.id] = row
+                row.grid(row=grid_row, column=0, sticky="ew", padx=10, pady=3)
+                grid_row += 1
+                if item is self.expanded:
+                    if self.detail is None:
+                        self.detail = DetailPanel(self)
+                    if self.detail.item is not item:
+                        self.detail.bind_item(item)
+                    self.detail.grid(row=grid_row, column=0, sticky="ew", padx=20, pady=(0, 8))
+                    grid_row += 1
+                    detail_shown = True
+            else:
+                row.grid_remove()
+
+        if self.detail is not None and not detail_shown:
+            self.detail.grid_remove()
+
+        if self.items:
+            self.empty_label.grid_remove()
+            total = len(self.items)
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + slots) / total))
+        else:
+            self.empty_label.grid(row=0, column=0, pady=20)
+            self.scrollbar.set(0.0, 1.0)
+
+    def toggle_detail(self, item):
+        self.expanded = None if self.expanded is item else item
+        if self.detail is not None:
+            self.detail.item = None
+        self.refresh()
+
+    # --- SCROLLING ---
+    def scroll_to(self, first):
+        first = max(0, min(int(first), len(self.items) - (self._slots - 1)))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if not self.items:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = self._slots if len(args) > 2 and args[2] == "pages" else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+
+    def _on_resize(self, event=None):
+        if self._capacity() != self._slots:
+            self.refresh()
+
+    def _owns(self, widget):
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = getattr(widget, "master", None)
+        return False
+
+    def _on_wheel(self, event):
+        if not self.items or not self._owns(event.widget):
+            return
+        if getattr(event, "num", None) == 4:
+            direction = -1
+        elif getattr(event, "num", None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + direction * WHEEL_ROWS)
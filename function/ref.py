@@ -4,13 +4,13 @@ import os
 import pygame
 import tempfile
 from pydub import AudioSegment
-import librosa
 import soundfile as sf
 import numpy as np
 import shutil
 from datetime import datetime
 
 from function.master_player import load_to_master
+import function.dsp as dsp
 
 
 # 1. Get absolute path to 'function' directory
@@ -53,105 +53,39 @@ def select_file(self):
         
         print(f"File selected: {file_path}")
 
-import librosa
 import soundfile as sf
 import numpy as np
 import os
 import tempfile
 
-def play_ref_audio(self):
+def ref_params(self):
+    """Snapshot of the Reference Editor sliders/switches as DSPParams (Tk thread only), None on error"""
     try:
         # Get correct key names created from labels (lowercase)
-        s_speed     = self.sliders_ref["speed"]["widget"].get()
-        s_pitch     = self.sliders_ref["pitch"]["widget"].get()
-        s_volume    = self.sliders_ref["volume"]["widget"].get()
-        s_reverb    = self.sliders_ref["reverb"]["widget"].get()
-        s_bass      = self.sliders_ref["bass"]["widget"].get()
-        s_treble    = self.sliders_ref["treble"]["widget"].get()
-        s_echo      = self.sliders_ref["echo"]["widget"].get()
-        s_chorus    = self.sliders_ref["chorus"]["widget"].get()
-        s_threshold = self.sliders_ref["thresh"]["widget"].get() 
-        s_ratio     = self.sliders_ref["ratio"]["widget"].get()
-
-        use_limiter   = self.ref_limiter_sw.get()
-        use_normalize = self.ref_normalize_sw.get()
-        use_gate      = self.ref_gate_sw.get()
+        ref_values = {k: v["widget"].get() for k, v in self.sliders_ref.items()}
+        switches = {
+            "limiter": self.ref_limiter_sw.get(),
+            "normalize": self.ref_normalize_sw.get(),
+            "gate": self.ref_gate_sw.get()
+        }
+        # Plain audio file: speed/pitch are applied by the DSP engine (pitch in semitones)
+        return dsp.DSPParams.from_dicts(ref_values, switches, time_pitch=True)
 
     except KeyError as ke:
         print(f"Ref Logic KeyError: {ke}")
-        return
+        return None
+
 
-    if hasattr(self, 'current_ref_path') and self.current_ref_path:
+def play_ref_audio(self, params, ref_path):
+    """Worker thread: process `ref_path` with the `params` snapshot taken by ref_params()"""
+    if ref_path:
         try:
-            # Load original file
-            y, sr = librosa.load(self.current_ref_path, sr=None)
-
-            # --- A. PITCH & SPEED (Librosa core) ---
-            if s_pitch != 0:
-                y = librosa.effects.pitch_shift(y, sr=sr, n_steps=s_pitch)
-            if s_speed != 1.0:
-                y = librosa.effects.time_stretch(y, rate=s_speed)
-
-            # --- B. EQUALIZER (Bass/Treble) ---
-            if s_bass != 0 or s_treble != 0:
-                D = librosa.stft(y)
-                if s_bass != 0:
-                    D[:20, :] *= (10 ** (s_bass / 20)) 
-                if s_treble != 0:
-                    D[256:, :] *= (10 ** (s_treble / 20))
-                y = librosa.istft(D)
-
-            # --- C. DYNAMIC RANGE COMPRESSOR (Threshold/Ratio) ---
-            # Helps balance loud/soft audio
-            rms = np.sqrt(np.mean(y**2))
-            thresh_linear = librosa.db_to_amplitude(s_threshold)
-            if rms > thresh_linear:
-                compression_gain = thresh_linear + (rms - thresh_linear) / s_ratio
-                y = y * (compression_gain / rms)
-
-            # --- D. ECHO & REVERB (Time-based effects) ---
-            # Simple echo (large delay)
-            if s_echo > 0:
-                delay_samples = int(0.2 * sr)
-                y_echo = np.zeros_like(y)
-                y_echo[delay_samples:] = y[:-delay_samples]
-                y = y + y_echo * s_echo
-
-            # Simulated Reverb (multiple layers of microscopic delays overlapping)
-            if s_reverb > 0:
-                reverb_signal = np.zeros_like(y)
-                for i in range(1, 5):
-                    delay = int(0.03 * i * sr)
-                    reverb_signal[delay:] += y[:-delay] * (s_reverb / (i * 2))
-                y = y + reverb_signal
-
-            # --- E. CHORUS (Phase effect) ---
-            if s_chorus > 0:
-                chorus_delay = int(0.025 * sr)
-                y_chorus = np.zeros_like(y)
-                y_chorus[chorus_delay:] = y[:-chorus_delay]
-                y = (y + y_chorus * s_chorus) / (1 + s_chorus)
-
-
-
-            # --- F. VOLUME & LIMITER ---
-            y = y * s_volume
-            # Prevent clipping (Clipping)
-            max_val = np.max(np.abs(y))
-            if max_val > 1.0:
-                y = y / max_val
-
-
-            # --- G. NOISE GATE & NORMALIZE ---
-            if use_gate == 1:
-                y[np.abs(y) < 0.005] = 0 # Block background noise
-
-            if use_normalize == 1:
-                max_peak = np.max(np.abs(y))
-                if max_peak > 0: y = y / max_peak
-
-            if use_limiter == 1:
-                y = np.clip(y, -1.0, 1.0)
+            # Load original file (librosa is only imported once the Reference Editor is used)
+            import librosa
+            y, sr = librosa.load(ref_path, sr=None)
+
+            # --- UNIFIED DSP ENGINE (same chain as Preview and Gen) ---
+            y = dsp.process(y, sr, params)
 
             # --- 3. EXPORT FILE AND LOAD MASTER ---
             # Get current file's directory path, then point to project root directory
@@ -165,10 +99,11 @@ def play_ref_audio(self):
             temp_path = os.path.join(temp_folder, "ref_master_output.wav")
 
             # Write file
-            sf.write(temp_path, y, sr)
+            sf.write(temp_path, y.T, sr)
             
-            duration = librosa.get_duration(y=y, sr=sr)
-            self.load_to_master(temp_path, os.path.basename(self.current_ref_path), duration)
+            duration = y.shape[1] / sr
+            # Runs on a worker thread: the player widgets are updated through the UI bus
+            self.ui_bus.call(self.load_to_master, temp_path, os.path.basename(ref_path), duration)
 
         except Exception as e:
             print(f"DSP Error: {e}")
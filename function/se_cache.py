@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+import function.lru_dir as lru_dir
+
+
+# --- SPEAKER EMBEDDING (SE) CACHE ---
+# Target-voice embeddings stored as tensors, keyed by the audio content (not the file name)
+# plus the extractor settings, so picking the same voice sample again skips VAD + extraction.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "cache", "se")
+
+# Maximum number of stored embeddings, least recently used are evicted first
+CACHE_MAX_ENTRIES = int(os.environ.get("VG_SE_CACHE_ENTRIES", "500"))
+
+# Bump when the extraction recipe changes so old embeddings are not reused
+EXTRACTOR_VERSION = "openvoice-v2"
+
+_cache = lru_dir.LRUDir(CACHE_DIR, ".pt", max_entries=CACHE_MAX_ENTRIES)
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """sha256 of the file content"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(content_hash, **settings):
+    """Content hash + extractor settings (vad, model version, ...) -> cache key"""
+    payload = json.dumps([EXTRACTOR_VERSION, content_hash, settings], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key, device="cpu"):
+    """Cached SE tensor for key (moved to device), or None"""
+    path = _cache.lookup(key)
+    if path is None:
+        return None
+    try:
+        import torch
+        return torch.load(path, map_location=device)
+    except Exception:
+        # Unreadable entry (interrupted write from an older run), treat as a miss
+        return None
+
+
+def store(key, se):
+    import torch
+    return _cache.store(key, lambda path: torch.save(se.detach().cpu(), path))
+
+
+def enforce_entry_cap(max_entries=None):
+    """Delete least recently used embeddings until at most max_entries remain"""
+    _cache.enforce(max_entries=max_entries)
+
+
+def get_stats():
+    stats = _cache.stats()
+    del stats["size_bytes"]
+    return stats
+
+
+def clear():
+    _cache.clear()
+
+
+def get_se(audio_path, model, target_dir="temp/processed", vad=True):
+    """
+    Drop-in for se_extractor.get_se(...)[0] with a persistent cache in front of it.
+    Same audio content + same settings -> embedding is loaded from disk instead of extracted.
+    """
+    key = make_key(hash_file(audio_path), vad=vad, model=getattr(model, "version", ""))
+    device = getattr(model, "device", "cpu")
+    se = lookup(key, device=device)
+    if se is not None:
+        print(f"📦 Voice pattern loaded from cache ({os.path.basename(audio_path)})")
+        return se
+
+    from openvoice_cli import se_extractor
+    se, _ = se_extractor.get_se(audio_path, vc_model=model, target_dir=target_dir, vad=vad)
+    store(key, se)
+    return se
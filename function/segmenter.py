@@ -0,0 +1,176 @@
+import math
+import os
+
+import function.engine as engine
+
+
+# --- SCRIPT SEGMENTATION ---
+# "lines": one segment per non-empty line (the original rule).
+# "balanced": sentence-aware segments sized to a character or estimated-duration budget, so every
+# TTS/clone worker gets about the same amount of work and no single segment dominates a batch.
+
+SPLIT_MODES = ("lines", "balanced")
+SPLIT_MODE = os.environ.get("VG_SPLIT_MODE", "lines").strip().lower()
+
+# Budget per segment in characters...
+MAX_CHARS = max(20, int(os.environ.get("VG_SPLIT_MAX_CHARS", "400")))
+# ...or, when set, in estimated seconds of speech (takes precedence over VG_SPLIT_MAX_CHARS)
+MAX_SECONDS = float(os.environ.get("VG_SPLIT_MAX_SECONDS", "0") or 0)
+# Segments smaller than this share of the budget are merged with a neighbour
+MIN_FRACTION = min(0.9, max(0.0, float(os.environ.get("VG_SPLIT_MIN_FRACTION", "0.25"))))
+
+# Speaking-rate estimate (characters per second at speed 1.0)
+CHARS_PER_SECOND = 15.0
+# Han/Kana/Hangul characters are roughly a syllable each
+CJK_CHARS_PER_SECOND = 5.0
+
+# Sentence-ending punctuation (Latin, CJK, Devanagari, Arabic/Urdu, Armenian, Ethiopic)
+_TERMINATORS = ".!?…。！？｡।॥؟۔։።"
+# Full-width stops end a sentence even without a following space
+_NO_SPACE_TERMINATORS = "。！？｡"
+# Quotes/brackets that belong to the sentence they close
+_CLOSERS = "\"'”’»)]}」』）】"
+# Where an over-long sentence may be cut when there is no sentence boundary
+_CLAUSE_BREAKS = ",;:،、，；："
+
+
+def is_cjk(ch):
+    code = ord(ch)
+    return (0x3040 <= code <= 0x30FF or 0x3400 <= code <= 0x4DBF or 0x4E00 <= code <= 0x9FFF
+            or 0xAC00 <= code <= 0xD7AF or 0xF900 <= code <= 0xFAFF)
+
+
+def estimate_seconds(text):
+    """Rough speech duration of `text` at normal rate"""
+    cjk = sum(1 for ch in text if is_cjk(ch))
+    return cjk / CJK_CHARS_PER_SECOND + (len(text) - cjk) / CHARS_PER_SECOND
+
+
+def split_sentences(text):
+    """Sentences of one paragraph; "3.14" or "v1.2" (no space after the dot) don't split"""
+    sentences = []
+    start = i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch not in _TERMINATORS:
+            i += 1
+            continue
+        j = i + 1
+        while j < n and (text[j] in _TERMINATORS or text[j] in _CLOSERS):
+            j += 1
+        if j >= n or text[j].isspace() or ch in _NO_SPACE_TERMINATORS:
+            sentence = text[start:j].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = j
+        i = j
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _cut_point(text, limit):
+    """Best place to cut `text` at or before `limit` chars: clause mark, then space, then hard cut"""
+    window = text[:limit]
+    for marks in (_CLAUSE_BREAKS, None):
+        best = -1
+        for k in range(len(window) - 1, limit // 3, -1):
+            c = window[k]
+            if (marks is not None and c in marks) or (marks is None and c.isspace()):
+                best = k + 1
+                break
+        if best > 0:
+            return best
+    return limit
+
+
+def join_sentences(parts):
+    """Space between sentences, except after CJK text (which is written without spaces)"""
+    text = parts[0]
+    for part in parts[1:]:
+        sep = "" if text and (is_cjk(text[-1]) or text[-1] in _NO_SPACE_TERMINATORS) else " "
+        text += sep + part
+    return text
+
+
+def split_long(sentence, max_units, measure):
+    """Cut a sentence that alone exceeds the budget into about equal pieces that fit"""
+    pieces = []
+    rest = sentence
+    while measure(rest) > max_units:
+        # Even share of what is left, assuming the measure grows about linearly with length
+        count = math.ceil(measure(rest) / max_units)
+        limit = max(1, math.ceil(len(rest) / count))
+        cut = _cut_point(rest, limit)
+        piece, rest = rest[:cut].strip(), rest[cut:].strip()
+        if piece:
+            pieces.append(piece)
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+
+def pack(pieces, max_units, measure):
+    """
+    Join consecutive sentences of one paragraph into segments of even size:
+    the paragraph needs ceil(total / max) segments, each aims for total / count.
+    """
+    if not pieces:
+        return []
+    total = sum(measure(p) for p in pieces)
+    count = max(1, math.ceil(total / max_units))
+    target = total / count
+
+    segments = []
+    current, size = [], 0.0
+    for piece in pieces:
+        units = measure(piece)
+        if current and (size + units > max_units or size >= target):
+            segments.append(join_sentences(current))
+            current, size = [], 0.0
+        current.append(piece)
+        size += units
+    if current:
+        segments.append(join_sentences(current))
+    return segments
+
+
+def merge_small(segments, min_units, max_units, measure):
+    """Merge fragments (headings, one-word lines) into a neighbour while the result fits the budget"""
+    merged = []
+    for seg in segments:
+        if merged:
+            prev = merged[-1]
+            if (measure(prev) < min_units or measure(seg) < min_units) and measure(prev) + measure(seg) <= max_units:
+                merged[-1] = prev + "\n" + seg
+                continue
+        merged.append(seg)
+    return merged
+
+
+def balanced_segments(raw_content, max_chars=None, max_seconds=None, min_fraction=None):
+    """Sentence-aware, length-balanced segments; segments never span a line unless one side is a fragment"""
+    max_seconds = MAX_SECONDS if max_seconds is None else max_seconds
+    if max_seconds:
+        measure, max_units = estimate_seconds, max_seconds
+    else:
+        measure, max_units = len, (max_chars or MAX_CHARS)
+    min_units = max_units * (MIN_FRACTION if min_fraction is None else min_fraction)
+
+    segments = []
+    for paragraph in engine.split_paragraphs(raw_content):
+        pieces = []
+        for sentence in split_sentences(paragraph):
+            pieces.extend(split_long(sentence, max_units, measure))
+        segments.extend(pack(pieces, max_units, measure))
+    return merge_small(segments, min_units, max_units, measure)
+
+
+def split_script(raw_content, mode=None):
+    """Queue segments for a script in the given mode ("lines" | "balanced", default VG_SPLIT_MODE)"""
+    mode = (mode or SPLIT_MODE).lower()
+    if mode == "balanced":
+        return balanced_segments(raw_content)
+    return engine.split_paragraphs(raw_content)
@@ -0,0 +1,190 @@
+import difflib
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+
+
+# --- SEGMENT MODEL ---
+# One Segment per queue paragraph: stable id, its own TTS/DSP settings, Gen/Clone status and the
+# audio file it renders to. The SegmentStore indexes them by id; the queue view only observes it.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMP_DIR = os.path.join(BASE_DIR, "temp")
+
+# Status values for Segment.status["gen"] / ["clone"]
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def content_hash(text):
+    """Identity of a paragraph for re-split diffing"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Segment:
+    id: int
+    text: str
+    voice: str
+    sliders: dict
+    switches: dict
+    preset: str = "Default"
+    audio_path: str = ""
+    status: dict = field(default_factory=lambda: {"gen": None, "clone": None})
+    text_hash: str = ""
+
+    def params(self):
+        """(voice, sliders, switches) copies, safe to hand to a worker thread"""
+        return self.voice, dict(self.sliders), dict(self.switches)
+
+    def existing_audio(self):
+        """Rendered audio of this segment (WAV first, then MP3) or None"""
+        mp3 = os.path.splitext(self.audio_path)[0] + ".mp3"
+        for path in (self.audio_path, mp3):
+            if path and os.path.exists(path):
+                return path
+        return None
+
+    def discard_audio(self):
+        """Delete this segment's rendered files (removed paragraph, or leftovers from an older session)"""
+        removed = []
+        while True:
+            path = self.existing_audio()
+            if path is None:
+                return removed
+            os.remove(path)
+            removed.append(path)
+
+
+class SegmentStore:
+    """
+    Ordered, id-indexed segments. Every lookup by id or position is O(1).
+    Observers are called as fn(kind, segment) with kind "order" (list changed, segment=None)
+    or "update" (one segment changed), on whatever thread made the change.
+    """
+
+    def __init__(self, temp_dir=TEMP_DIR):
+        self.temp_dir = temp_dir
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._order = []
+        self._position = {}
+        self._next_id = 1
+        self._observers = []
+
+    # --- OBSERVERS ---
+    def subscribe(self, fn):
+        self._observers.append(fn)
+
+    def _notify(self, kind, segment=None):
+        for fn in list(self._observers):
+            try:
+                fn(kind, segment)
+            except Exception as e:
+                print(f"⚠️ Segment observer error: {e}")
+
+    # --- READ ---
+    def __len__(self):
+        return len(self._order)
+
+    def segments(self):
+        """Snapshot list in queue order"""
+        with self._lock:
+            return [self._by_id[i] for i in self._order]
+
+    def get(self, seg_id):
+        return self._by_id.get(seg_id)
+
+    def position(self, seg_id):
+        """1-based place in the queue (what the UI shows as "Segment N")"""
+        return self._position[seg_id] + 1
+
+    def audio_path_for(self, seg_id):
+        """Files are named by segment id, so they stay with their paragraph when the order changes"""
+        return os.path.join(self.temp_dir, f"seg_{seg_id}.wav")
+
+    # --- WRITE ---
+    def _new_segment(self, text, voice, sliders, switches, preset="Default"):
+        # Ids are never reused, a new paragraph can't pick up another one's audio file
+        seg = Segment(self._next_id, text, voice, dict(sliders), dict(switches), preset=preset,
+                      audio_path=self.audio_path_for(self._next_id), text_hash=content_hash(text))
+        self._next_id += 1
+        self._by_id[seg.id] = seg
+        return seg
+
+    def _reindex(self):
+        self._position = {seg_id: pos for pos, seg_id in enumerate(self._order)}
+
+    def resplit(self, texts, defaults):
+        """
+        Replace the queue with `texts`, diffing against the current segments by content hash.
+        Unchanged paragraphs keep their segment (id, settings, status, audio). An edited paragraph
+        gets a new segment that inherits the settings of the one it replaced; inserted ones use
+        `defaults` (voice, sliders, switches). Returns (kept, added, removed) segment lists.
+        """
+        voice, sliders, switches = defaults
+        with self._lock:
+            old = [self._by_id[i] for i in self._order]
+            new_hashes = [content_hash(t) for t in texts]
+            matcher = difflib.SequenceMatcher(None, [s.text_hash for s in old], new_hashes, autojunk=False)
+
+            order, kept, added, removed = [], [], [], []
+            for op, i1, i2, j1, j2 in matcher.get_opcodes():
+                if op == "equal":
+                    kept.extend(old[i1:i2])
+                    order.extend(s.id for s in old[i1:i2])
+                    continue
+                replaced = old[i1:i2]
+                removed.extend(replaced)
+                for k, text in enumerate(texts[j1:j2]):
+                    if k < len(replaced):
+                        src = replaced[k]
+                        seg = self._new_segment(text, src.voice, src.sliders, src.switches, src.preset)
+                    else:
+                        seg = self._new_segment(text, voice, sliders, switches)
+                    added.append(seg)
+                    order.append(seg.id)
+
+            for seg in removed:
+                del self._by_id[seg.id]
+            self._order = order
+            self._reindex()
+        self._notify("order")
+        return kept, added, removed
+
+    def add(self, text, voice, sliders, switches):
+        """Append one segment at the end of the queue"""
+        with self._lock:
+            seg = self._new_segment(text, voice, sliders, switches)
+            self._order.append(seg.id)
+            self._reindex()
+        self._notify("order")
+        return seg
+
+    def update(self, seg_id, **fields):
+        """Change segment fields (voice, sliders, switches, preset, ...) and notify observers"""
+        with self._lock:
+            seg = self._by_id.get(seg_id)
+            if seg is None:
+                return None
+            for name, value in fields.items():
+                setattr(seg, name, value)
+        self._notify("update", seg)
+        return seg
+
+    def set_status(self, seg_id, stage, value):
+        """Record a Gen/Clone result ("gen" | "clone" -> STATUS_OK | STATUS_ERROR | None)"""
+        with self._lock:
+            seg = self._by_id.get(seg_id)
+            if seg is None:
+                return None
+            seg.status[stage] = value
+            # A cloned file is also a finished render
+            if stage == "clone" and value == STATUS_OK:
+                seg.status["gen"] = STATUS_OK
+            # A new render overwrites the cloned file, the segment has to be cloned again
+            if stage == "gen" and value == STATUS_OK:
+                seg.status["clone"] = None
+        self._notify("update", seg)
+        return seg
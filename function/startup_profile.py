@@ -0,0 +1,84 @@
+import builtins
+import os
+import sys
+import threading
+import time
+
+
+# --- STARTUP TIMING REPORT ---
+# Import time per module (first import only, main thread) plus named init phases, printed once
+# the window is up. VG_STARTUP_REPORT=1 also lists the slowest individual modules.
+
+REPORT_MODULES = os.environ.get("VG_STARTUP_REPORT", "0") != "0"
+TOP_MODULES = 12
+
+_t0 = time.perf_counter()
+_last_mark = _t0
+_phases = []      # (name, seconds)
+_imports = {}     # top-level package -> seconds spent in its first imports (outermost only)
+_modules = []     # (module name, inclusive seconds)
+_orig_import = None
+_depth = 0
+_main_thread = threading.get_ident()
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    global _depth
+    if level != 0 or name in sys.modules or threading.get_ident() != _main_thread:
+        return _orig_import(name, globals, locals, fromlist, level)
+
+    t = time.perf_counter()
+    _depth += 1
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        elapsed = time.perf_counter() - t
+        _modules.append((name, elapsed))
+        if _depth == 0:
+            top = name.split(".")[0] if not name.startswith("function.") else name
+            _imports[top] = _imports.get(top, 0.0) + elapsed
+
+
+def start_import_tracking():
+    """Time every new import from here on (call first thing in app.py)"""
+    global _orig_import
+    if _orig_import is None:
+        _orig_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def stop_import_tracking():
+    global _orig_import, _last_mark
+    if _orig_import is not None:
+        builtins.__import__ = _orig_import
+        _orig_import = None
+    _phases.append(("imports", time.perf_counter() - _last_mark))
+    _last_mark = time.perf_counter()
+
+
+def mark(name):
+    """Close the current init phase under `name` (time since the previous mark)"""
+    global _last_mark
+    now = time.perf_counter()
+    _phases.append((name, now - _last_mark))
+    _last_mark = now
+
+
+def report():
+    """Print the breakdown (call once the window is shown)"""
+    total = time.perf_counter() - _t0
+    lines = [f"💻 Startup: window ready in {total:.2f}s"]
+    for name, seconds in _phases:
+        lines.append(f"   • {name:<24} {seconds:6.3f}s")
+    if _imports:
+        lines.append("   Imports by module:")
+        for name, seconds in sorted(_imports.items(), key=lambda kv: -kv[1]):
+            if seconds >= 0.005:
+                lines.append(f"     - {name:<28} {seconds:6.3f}s")
+    if REPORT_MODULES and _modules:
+        lines.append(f"   Slowest modules (inclusive, top {TOP_MODULES}):")
+        for name, seconds in sorted(_modules, key=lambda kv: -kv[1])[:TOP_MODULES]:
+            lines.append(f"     - {name:<28} {seconds:6.3f}s")
+    print("\n".join(lines))
+    return total
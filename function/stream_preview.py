@@ -0,0 +1,272 @@
+import asyncio
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import edge_tts
+import numpy as np
+import pygame
+
+import function.dsp as dsp
+import function.tts_cache as tts_cache
+import function.tts_loop as tts_loop
+
+
+# Edge-TTS returns 24 kHz mono MP3 frames
+STREAM_SAMPLE_RATE = 24000
+# Samples per DSP block (~170 ms at 24 kHz)
+STREAM_BLOCK_SIZE = 4096
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_active_lock = threading.Lock()
+_active_player = None
+
+
+def find_ffmpeg():
+    """Bundled ffmpeg.exe in function/ first, then whatever is on PATH"""
+    local = os.path.join(BASE_DIR, "ffmpeg.exe")
+    if os.path.exists(local):
+        return local
+    return shutil.which("ffmpeg")
+
+
+class Mp3StreamDecoder:
+    """
+    Incremental MP3 -> float32 PCM decoder.
+    MP3 bytes are piped into an ffmpeg process as they arrive; PCM blocks are read back
+    from its stdout on another thread, so decoding overlaps with the network download.
+    """
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE, block_size=STREAM_BLOCK_SIZE):
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            raise RuntimeError("ffmpeg not found, streaming preview is unavailable")
+
+        self.block_size = block_size
+        cmd = [
+            ffmpeg, "-hide_banner", "-loglevel", "error",
+            "-f", "mp3", "-i", "pipe:0",
+            "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "pipe:1",
+        ]
+        # Don't flash a console window on Windows
+        flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, creationflags=flags)
+
+    def feed(self, data):
+        self.proc.stdin.write(data)
+        self.proc.stdin.flush()
+
+    def close_input(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+
+    def blocks(self):
+        """Yield decoded float32 blocks until ffmpeg reaches end of stream"""
+        n_bytes = self.block_size * 4
+        while True:
+            buf = self.proc.stdout.read(n_bytes)
+            if not buf:
+                break
+            usable = len(buf) - (len(buf) % 4)
+            if usable:
+                yield np.frombuffer(buf[:usable], dtype=np.float32).copy()
+        self.proc.wait()
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+
+
+class StreamPlayer:
+    """
+    Gapless block player on top of pygame.mixer.
+    Blocks are queued on one channel; whatever has arrived since the last refill
+    is merged into a single Sound so slow network chunks don't cause clicks.
+    """
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=sample_rate, size=-16, channels=1, buffer=1024)
+        self.mixer_rate, _, self.mixer_channels = pygame.mixer.get_init()
+        self.sample_rate = sample_rate
+
+        self.blocks = queue.Queue()
+        self.channel = None
+        self.started_at = None
+        self.first_sound_at = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def enqueue(self, y):
+        if len(y):
+            self.blocks.put(y)
+
+    def finish(self):
+        """No more blocks will be enqueued"""
+        self.blocks.put(None)
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def stop(self):
+        self._stop.set()
+        self.blocks.put(None)
+        if self.channel is not None:
+            self.channel.stop()
+
+    def _to_sound(self, y):
+        if self.mixer_rate != self.sample_rate:
+            n_out = int(len(y) * self.mixer_rate / self.sample_rate)
+            y = np.interp(np.linspace(0, len(y) - 1, n_out), np.arange(len(y)), y)
+        pcm = (np.clip(y, -1.0, 1.0) * 32767).astype(np.int16)
+        if self.mixer_channels > 1:
+            pcm = np.repeat(pcm[:, None], self.mixer_channels, axis=1)
+        return pygame.mixer.Sound(buffer=np.ascontiguousarray(pcm).tobytes())
+
+    def _next_sound(self, timeout):
+        """Merge every block that is already waiting; None at end of stream"""
+        try:
+            first = self.blocks.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        if first is None:
+            return None
+        parts = [first]
+        while True:
+            try:
+                nxt = self.blocks.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                self.blocks.put(None)
+                break
+            parts.append(nxt)
+        return self._to_sound(np.concatenate(parts))
+
+    def _pump(self):
+        while not self._stop.is_set():
+            # Keep exactly one Sound queued behind the one that is playing
+            if self.channel is not None and self.channel.get_queue() is not None:
+                time.sleep(0.005)
+                continue
+
+            sound = self._next_sound(timeout=0.02)
+            if sound is False:
+                continue
+            if sound is None:
+                break
+
+            if self.channel is None:
+                self.channel = sound.play()
+                self.first_sound_at = time.perf_counter()
+                print(f"🎵 Preview started after {self.first_sound_at - self.started_at:.2f}s")
+            else:
+                self.channel.queue(sound)
+
+
+def stop_active():
+    """Stop the streaming preview that is currently playing (if any)"""
+    global _active_player
+    with _active_lock:
+        if _active_player is not None:
+            _active_player.stop()
+            _active_player = None
+
+
+def stream_preview(text, voice, rate_str, pitch_str, vol_str, params):
+    """
+    Synthesize, process and play preview audio at the same time.
+    Audio starts with the first decoded block while Edge-TTS is still sending the rest.
+    Network audio is collected in memory and cached only when the whole stream arrived;
+    a newer preview stops this one, including its download.
+    Returns (processed_audio, sample_rate) once the whole text has been played out/queued,
+    or (None, sample_rate) when the preview was stopped before the end.
+    """
+    global _active_player
+    stop_active()
+
+    sr = STREAM_SAMPLE_RATE
+    decoder = Mp3StreamDecoder(sample_rate=sr)
+    processor = dsp.chain_pool.checkout(params, sr)
+    player = StreamPlayer(sample_rate=sr)
+    with _active_lock:
+        _active_player = player
+    player.start()
+
+    processed = []
+
+    def consume():
+        for block in decoder.blocks():
+            # Mono stream: DSP engine works on (channels, samples)
+            y = processor.process_block(block)[0]
+            processed.append(y)
+            player.enqueue(y)
+        player.finish()
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    key = tts_cache.make_key(text, voice, rate_str, pitch_str, vol_str)
+    cached = tts_cache.lookup(key)
+
+    try:
+        if cached:
+            # Cached audio is decoded through the same pipe, only without network waits
+            with open(cached, "rb") as f:
+                while not player.stopped:
+                    data = f.read(16384)
+                    if not data:
+                        break
+                    decoder.feed(data)
+        else:
+            async def pump_network():
+                communicate = edge_tts.Communicate(text, voice, rate=rate_str, pitch=pitch_str, volume=vol_str)
+                data = bytearray()
+                async for chunk in communicate.stream():
+                    if player.stopped:
+                        # Superseded by a newer preview: partial audio is never cached
+                        return None
+                    if chunk["type"] == "audio":
+                        # Pipe writes can block, keep them off the shared loop thread
+                        await asyncio.to_thread(decoder.feed, chunk["data"])
+                        data.extend(chunk["data"])
+                return bytes(data)
+
+            data = tts_loop.run(pump_network())
+            if data:
+                tts_cache.store_bytes(key, data)
+    except Exception:
+        decoder.kill()
+        player.stop()
+        raise
+    finally:
+        decoder.close_input()
+        # Also on failure: the consumer ends once the decoder is gone, the chain goes back to the pool
+        consumer.join()
+        dsp.chain_pool.checkin(processor)
+        # A stopped player (failed, or superseded) must not stay registered as the active one
+        if player.stopped:
+            with _active_lock:
+                if _active_player is player:
+                    _active_player = None
+
+    if player.stopped:
+        return None, sr
+    y = np.concatenate(processed) if processed else np.zeros(0, dtype=np.float32)
+    # Live blocks play un-normalized; the saved result gets the same normalize as the buffered mode
+    if params.normalize:
+        dsp.normalize(y)
+    return y, sr
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import edge_tts
+
+import function.lru_dir as lru_dir
+
+
+# --- CACHE CONFIGURATION ---
+
+# Cache lives next to temp/ (not inside it) so "clear temp on exit" keeps it
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "cache", "tts")
+
+# Size cap for raw Edge-TTS output (MB), oldest-used entries are evicted first
+CACHE_MAX_MB = int(os.environ.get("VG_TTS_CACHE_MB", "500"))
+
+_cache = lru_dir.LRUDir(CACHE_DIR, ".mp3", max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+
+def make_key(text, voice, rate_str, pitch_str, vol_str):
+    """Content address of one Edge-TTS request (same inputs -> same audio)"""
+    payload = json.dumps([text, voice, rate_str, pitch_str, vol_str], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key):
+    """Return path of cached raw audio for key, or None (updates hit/miss counters)"""
+    return _cache.lookup(key)
+
+
+def store_bytes(key, data):
+    """
+    Write raw TTS bytes into the cache (evicts once the size cap is passed).
+    Blocking file IO: coroutines on the shared loop call it through asyncio.to_thread.
+    """
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return _cache.store(key, write)
+
+
+def enforce_size_cap(max_mb=None):
+    """Delete least recently used entries until the cache fits in max_mb"""
+    _cache.enforce(max_bytes=None if max_mb is None else max_mb * 1024 * 1024)
+
+
+def _read_entry(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def get_stats():
+    """Snapshot of counters plus current cache size"""
+    stats = _cache.stats()
+    stats["size_mb"] = round(stats.pop("size_bytes") / (1024 * 1024), 2)
+    return stats
+
+
+def clear():
+    """Remove every cached entry and reset counters"""
+    _cache.clear()
+
+
+async def fetch_tts_bytes(text, voice, rate_str, pitch_str, vol_str):
+    """
+    Raw MP3 bytes for one request, entirely in memory.
+    Cache hit -> read the entry; miss -> collect Communicate.stream() audio chunks and cache them.
+    Cache file IO runs in a worker thread, so it never stalls other streams on the shared loop.
+    """
+    key = make_key(text, voice, rate_str, pitch_str, vol_str)
+    cached = await asyncio.to_thread(lookup, key)
+    if cached:
+        try:
+            return await asyncio.to_thread(_read_entry, cached)
+        except FileNotFoundError:
+            # Entry was evicted between lookup and read, fall through to the network
+            pass
+
+    communicate = edge_tts.Communicate(text, voice, rate=rate_str, pitch=pitch_str, volume=vol_str)
+    buf = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            buf.extend(chunk["data"])
+    if not buf:
+        raise RuntimeError("No audio was received from Edge-TTS")
+
+    data = bytes(buf)
+    await asyncio.to_thread(store_bytes, key, data)
+    return data
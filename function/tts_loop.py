@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+
+# --- SHARED EVENT LOOP FOR ALL EDGE-TTS TRAFFIC ---
+# One daemon thread owns a long-lived asyncio loop. Preview, Gen, Generate All, the voice catalog
+# and the headless engine all submit their coroutines here instead of creating a loop per request.
+
+_lock = threading.Lock()
+_loop = None
+_thread = None
+
+
+def get_loop():
+    """Start the loop thread on first use and return its event loop"""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=run, name="tts-loop", daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop = loop
+        return _loop
+
+
+def in_loop_thread():
+    return _thread is not None and threading.current_thread() is _thread
+
+
+def submit(coro, on_done=None):
+    """
+    Schedule a coroutine on the shared loop from any thread.
+    Returns a concurrent.futures.Future; on_done(future) runs on the loop thread when it finishes
+    (Tk callers should hop back through self.ui_bus).
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    if on_done:
+        future.add_done_callback(on_done)
+    return future
+
+
+def run(coro, timeout=None):
+    """Blocking helper for worker threads: submit and wait for the result"""
+    if in_loop_thread():
+        raise RuntimeError("tts_loop.run() called from the loop thread, await the coroutine instead")
+    return submit(coro).result(timeout)
+
+
+def shutdown():
+    """Stop the loop thread (pending coroutines are cancelled)"""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+    if loop is None:
+        return
+
+    def stop():
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.stop()
+
+    loop.call_soon_threadsafe(stop)
+    thread.join(timeout=2)
+    if not loop.is_running():
+        loop.close()
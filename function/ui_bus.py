@@ -0,0 +1,65 @@
+import itertools
+import os
+import threading
+
+
+# --- UI UPDATE BUS ---
+# Worker threads never call Tk. They post updates here and the Tk main loop applies them once per
+# frame, so a burst of hundreds of finished segments costs a handful of repaints, not hundreds of
+# cross-thread Tk calls.
+
+# How often the Tk side drains the bus (ms), ~30 fps
+FRAME_MS = max(5, int(os.environ.get("VG_UI_FRAME_MS", "33")))
+
+
+class UIBus:
+    """
+    post(key, fn, *args): coalesced, only the latest update per key is applied (row repaints, progress labels).
+    call(fn, *args): applied once, in posting order (dialogs, player loads).
+    Both are safe from any thread; fn always runs on the Tk thread.
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._seq = itertools.count()
+        self._running = False
+        self.stats = {"posted": 0, "applied": 0, "frames": 0}
+
+    def post(self, key, fn, *args):
+        with self._lock:
+            # Re-posting a key replaces its update but keeps its place in the frame
+            self._pending[key] = (fn, args)
+            self.stats["posted"] += 1
+
+    def call(self, fn, *args):
+        self.post(("call", next(self._seq)), fn, *args)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+
+    def _drain(self):
+        if not self._running:
+            return
+        # Book the next frame first: a modal dialog opened below runs its own event loop
+        self.root.after(self.frame_ms, self._drain)
+
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        self.stats["frames"] += 1
+        self.stats["applied"] += len(batch)
+        for fn, args in batch.values():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ UI update error: {e}")
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+
+import edge_tts
+
+import function.tts_loop as tts_loop
+
+
+# --- CATALOG CONFIGURATION ---
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_PATH = os.path.join(BASE_DIR, "cache", "voices.json")
+
+# After this many hours the cached catalog is refreshed in the background (it is still used meanwhile)
+CATALOG_TTL_HOURS = float(os.environ.get("VG_VOICE_CATALOG_TTL_H", "168"))
+
+# Used only when there is no cached catalog and the network is unreachable
+FALLBACK_VOICES = ["vi-VN-HoaiMyNeural", "vi-VN-NamMinhNeural"]
+
+
+def fetch_catalog():
+    """Download the full Edge TTS voice list (all metadata, not only ShortName)"""
+    return tts_loop.run(edge_tts.list_voices())
+
+
+def load_catalog():
+    """
+    Read the cached catalog from disk.
+    Returns (voices, fetched_at); voices is None if there is no usable cache file.
+    """
+    try:
+        with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        voices = data.get("voices")
+        if not voices:
+            return None, 0
+        return voices, float(data.get("fetched_at", 0))
+    except (OSError, ValueError):
+        return None, 0
+
+
+def save_catalog(voices):
+    """Persist catalog atomically so a crash mid-write never leaves a broken file"""
+    os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
+    tmp_path = CATALOG_PATH + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "voices": voices}, f, ensure_ascii=False)
+    os.replace(tmp_path, CATALOG_PATH)
+
+
+def is_stale(fetched_at):
+    return (time.time() - fetched_at) > CATALOG_TTL_HOURS * 3600
+
+
+def voice_names(voices):
+    """ShortName list sorted alphabetically for easy search"""
+    return sorted(v["ShortName"] for v in voices)
+
+
+def refresh():
+    """Fetch from network, write cache file, return the new catalog"""
+    voices = fetch_catalog()
+    save_catalog(voices)
+    return voices
+
+
+def refresh_in_background(on_done, on_error=None):
+    """Run refresh() on a daemon thread; on_done(voices) is called from that thread"""
+    def run():
+        try:
+            voices = refresh()
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        on_done(voices)
+
+    threading.Thread(target=run, daemon=True).start()
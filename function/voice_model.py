@@ -0,0 +1,134 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+
+# --- RESIDENT TONE COLOR CONVERTER ---
+# One ToneColorConverter per process, loaded on first use (or warmed up after startup),
+# shared by "Clone" and "Clone All", and released again after it has been idle for a while.
+# torch / openvoice are imported on first use, not at app startup.
+# Must not import tkinter/customtkinter.
+
+# Converter checkpoint folder (relative to the working directory, same as download_models.py)
+CKPT_DIR = os.environ.get("VG_CONVERTER_DIR", os.path.join("checkpoints_v2", "converter"))
+
+# Free the model after this many idle seconds (0 = keep it loaded until exit)
+IDLE_UNLOAD_SEC = float(os.environ.get("VG_CLONE_IDLE_UNLOAD_S", "600"))
+
+# Opt-in (VG_CLONE_WARMUP=1): load the model in the background right after the window opens.
+# Off by default, so launches that never clone don't pay for importing torch/openvoice.
+WARMUP_ON_START = os.environ.get("VG_CLONE_WARMUP", "0") == "1"
+
+_lock = threading.RLock()
+_model = None
+_users = 0
+_last_used = 0.0
+_watchdog = None
+_device = None
+
+
+def get_device():
+    """AI execution device (Priority GPU if available, else CPU); imports torch on first call"""
+    global _device
+    if _device is None:
+        import torch
+        _device = "cuda" if torch.cuda.is_available() else "cpu"
+    return _device
+
+
+def is_loaded():
+    return _model is not None
+
+
+def _load():
+    ckpt_dir = os.path.abspath(CKPT_DIR)
+    t0 = time.perf_counter()
+    print("📦 Loading OpenVoice model...")
+    from openvoice_cli.api import ToneColorConverter
+    device = get_device()
+    model = ToneColorConverter(os.path.join(ckpt_dir, "config.json"), device=device)
+    model.load_ckpt(os.path.join(ckpt_dir, "checkpoint.pth"))
+    print(f"✅ OpenVoice model ready on {device} ({time.perf_counter() - t0:.1f}s)")
+    return model
+
+
+def get_converter():
+    """Return the shared converter, loading it on first call (concurrent callers wait for one load)"""
+    global _model, _last_used
+    with _lock:
+        if _model is None:
+            _model = _load()
+            _start_watchdog()
+        _last_used = time.monotonic()
+        return _model
+
+
+@contextmanager
+def use():
+    """
+    with voice_model.use() as model: ...
+    The model is never unloaded while a caller is inside this block.
+    """
+    global _users, _last_used
+    with _lock:
+        model = get_converter()
+        _users += 1
+    try:
+        yield model
+    finally:
+        with _lock:
+            _users -= 1
+            _last_used = time.monotonic()
+
+
+def unload():
+    """Drop the model if nobody is using it; returns True if it was released"""
+    global _model
+    with _lock:
+        if _model is None or _users > 0:
+            return False
+        _model = None
+    gc.collect()
+    if get_device() == "cuda":
+        import torch
+        torch.cuda.empty_cache()
+    print("📦 OpenVoice model unloaded (idle)")
+    return True
+
+
+def _start_watchdog():
+    global _watchdog
+    if IDLE_UNLOAD_SEC <= 0 or (_watchdog is not None and _watchdog.is_alive()):
+        return
+    _watchdog = threading.Thread(target=_watch, name="voice-model-idle", daemon=True)
+    _watchdog.start()
+
+
+def _watch():
+    while True:
+        time.sleep(min(30.0, IDLE_UNLOAD_SEC))
+        with _lock:
+            if _model is None:
+                return
+            idle = time.monotonic() - _last_used
+            if _users == 0 and idle >= IDLE_UNLOAD_SEC:
+                unload()
+                return
+
+
+def warmup_in_background(on_done=None, on_error=None):
+    """Load the model on a daemon thread so the first "Clone" click doesn't pay for it"""
+    def run():
+        try:
+            get_converter()
+            if on_done:
+                on_done()
+        except Exception as e:
+            print(f"⚠️ OpenVoice warm-up failed: {e}")
+            if on_error:
+                on_error(e)
+
+    threading.Thread(target=run, name="voice-model-warmup", daemon=True).start()